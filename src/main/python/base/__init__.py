@@ -1,6 +1,7 @@
-from .threading import QWorker
+from .threading import QWorker, CancelToken
 from .configuration import config
 from .context import context as ctx
 from .version import Version
+from .timing import Timings, timings
 
-__all__ = [QWorker, config, ctx, Version]
+__all__ = [QWorker, CancelToken, config, ctx, Version, Timings, timings]
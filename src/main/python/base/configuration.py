@@ -20,6 +20,7 @@ class Configuration:
 
         # Files and folders in each transect directory
         self.markedImageFolderName = ".marked"
+        self.thumbnailFolderName = ".thumbnails"
 
         # Default library directory
         self.defaultLibraryDirectory = Path.home() / "Pictures/ImageWAO"
@@ -120,6 +121,10 @@ class Configuration:
         self.gridImageUpdateWidth = 25
         self.gridImageMargin = 2
 
+        # Grid images are decoded at a reduced resolution, such that each
+        # part of the grid is this wide. Wider grids scale these parts up.
+        self.gridThumbnailWidth = 400
+
         # Button sizes
         self.toolbuttonSize = (20, 20)
 
@@ -174,7 +179,7 @@ class Configuration:
             f.write(version.toString())
 
     def logFolder(self):
-        folder = self._imageWaoMetaFolder / "logs"
+        folder = self._imageWaoMetaFolder() / "logs"
         folder.mkdir(parents=True, exist_ok=True)
         return folder
 
@@ -202,6 +207,22 @@ class Configuration:
     def transectMigrationLog(self, transectFolder):
         return self.markedFolder(transectFolder) / "migration.log"
 
+    # Thumbnail folder (within transect)
+
+    def thumbnailFolder(self, transectFolder):
+        return Path(transectFolder) / self.thumbnailFolderName
+
+    def thumbnailIndexFile(self, transectFolder):
+        return self.thumbnailFolder(transectFolder) / "index.json"
+
+    # Decoded pixel cache (shared by all transects, on this computer only)
+
+    def pixelCacheFolder(self):
+        cacheLocation = QtCore.QStandardPaths.writableLocation(
+            QtCore.QStandardPaths.CacheLocation
+        )
+        return Path(cacheLocation) / "pixels"
+
     @property
     def username(self):
         settings = QtCore.QSettings()
@@ -234,6 +255,143 @@ class Configuration:
         settings = QtCore.QSettings()
         settings.setValue("import/flightImportDirectory", value)
 
+    @property
+    def maxLoadWorkers(self) -> int:
+        """Maximum number of threads decoding images. 0 means no limit."""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/maxLoadWorkers", 0))
+
+    @maxLoadWorkers.setter
+    def maxLoadWorkers(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/maxLoadWorkers", value)
+
+    def loadWorkerCount(self) -> int:
+        """
+        The number of threads to decode images on.
+        One per core, capped by `maxLoadWorkers` if it is set.
+        """
+        count = max(1, QtCore.QThread.idealThreadCount())
+        if self.maxLoadWorkers > 0:
+            count = min(count, self.maxLoadWorkers)
+        return count
+
+    @property
+    def thumbnailCacheLimit(self) -> int:
+        """Maximum size of the thumbnail cache of each transect, in MB"""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/thumbnailCacheLimit", 200))
+
+    @thumbnailCacheLimit.setter
+    def thumbnailCacheLimit(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/thumbnailCacheLimit", value)
+
+    @property
+    def pixelMemoryBudget(self) -> int:
+        """Memory that decoded images may take up, in MB"""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/pixelMemoryBudget", 1536))
+
+    @pixelMemoryBudget.setter
+    def pixelMemoryBudget(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/pixelMemoryBudget", value)
+
+    @property
+    def pixelCacheEnabled(self) -> bool:
+        """Whether to keep decoded images on disk, so they open faster next time"""
+        settings = QtCore.QSettings()
+        return bool(int(settings.value("grid/pixelCacheEnabled", 0)))
+
+    @pixelCacheEnabled.setter
+    def pixelCacheEnabled(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/pixelCacheEnabled", int(value))
+
+    @property
+    def pixelCacheLimit(self) -> int:
+        """Maximum size of the decoded image cache, in MB"""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/pixelCacheLimit", 4096))
+
+    @pixelCacheLimit.setter
+    def pixelCacheLimit(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/pixelCacheLimit", value)
+
+    @property
+    def gridRows(self) -> int:
+        """Number of rows that each image is divided into in the grid"""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/rows", 2))
+
+    @gridRows.setter
+    def gridRows(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/rows", value)
+
+    @property
+    def gridColumns(self) -> int:
+        """Number of columns that each image is divided into in the grid"""
+        settings = QtCore.QSettings()
+        return int(settings.value("grid/columns", 2))
+
+    @gridColumns.setter
+    def gridColumns(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/columns", value)
+
+    @property
+    def prefetchNextTransect(self) -> bool:
+        """Whether to prepare the next transect while the current one is open"""
+        settings = QtCore.QSettings()
+        return bool(int(settings.value("grid/prefetchNextTransect", 0)))
+
+    @prefetchNextTransect.setter
+    def prefetchNextTransect(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("grid/prefetchNextTransect", int(value))
+
+    @property
+    def autosaveDelay(self) -> int:
+        """
+        Seconds after the last change that changes are saved automatically.
+        0 turns autosaving off.
+        """
+        settings = QtCore.QSettings()
+        return int(settings.value("saving/autosaveDelay", 30))
+
+    @autosaveDelay.setter
+    def autosaveDelay(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("saving/autosaveDelay", value)
+
+    @property
+    def markedOverlays(self) -> bool:
+        """
+        Whether marked images are saved as overlays of the drawings only,
+        instead of as copies of the images with the drawings painted on
+        """
+        settings = QtCore.QSettings()
+        return bool(int(settings.value("saving/markedOverlays", 0)))
+
+    @markedOverlays.setter
+    def markedOverlays(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("saving/markedOverlays", int(value))
+
+    @property
+    def recordTimings(self) -> bool:
+        """Whether to record how long operations take, for diagnostics"""
+        settings = QtCore.QSettings()
+        return bool(int(settings.value("diagnostics/recordTimings", 0)))
+
+    @recordTimings.setter
+    def recordTimings(self, value):
+        settings = QtCore.QSettings()
+        settings.setValue("diagnostics/recordTimings", int(value))
+
     @property
     def maxPhotoDelay(self):
         settings = QtCore.QSettings()
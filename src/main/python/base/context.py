@@ -42,9 +42,5 @@ class AppContext(ApplicationContext):
     def explorerIcon(self):
         return QtGui.QIcon(self.get_resource("icons/explorer.png"))
 
-    @cached_property
-    def loadingAnimalsPixmap(self):
-        return QtGui.QPixmap(self.get_resource("images/loadingAnimals.png"))
-
 
 context = AppContext()
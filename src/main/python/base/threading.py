@@ -1,4 +1,5 @@
 import sys
+import threading
 import traceback
 from enum import Enum
 from multiprocessing import Process, Queue
@@ -80,6 +81,29 @@ class QWorker(QtCore.QRunnable):
             self.signals.finished.emit()
 
 
+class CancelToken:
+    """
+    Lets the thread that started a job ask the job to stop.
+
+    Jobs are expected to check `isCancelled` at convenient points,
+    and stop as soon as it returns `True`.
+
+    :param generation: Number of the job this token belongs to. When a job
+                       is superseded by a newer one, only results tagged
+                       with the generation of the newest job are used.
+    """
+
+    def __init__(self, generation=0):
+        self.generation = generation
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def isCancelled(self):
+        return self._cancelled.is_set()
+
+
 # Runner lives on the runner thread
 
 
@@ -0,0 +1,254 @@
+"""
+Timing of the operations that users have to wait for.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+from .configuration import config
+
+
+class Histogram:
+    """
+    The durations of one operation, counted in buckets that double in
+    width: under 1 ms, 1 to 2 ms, 2 to 4 ms, and so on. The last bucket
+    holds everything that took longer.
+    """
+
+    bucketCount = 20
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * self.bucketCount
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[self.bucketOf(seconds)] += 1
+
+    def copy(self):
+        other = Histogram()
+        other.count = self.count
+        other.total = self.total
+        other.min = self.min
+        other.max = self.max
+        other.buckets = list(self.buckets)
+        return other
+
+    @classmethod
+    def bucketOf(cls, seconds):
+        milliseconds = seconds * 1000
+        if milliseconds < 1:
+            return 0
+        return min(int(math.log2(milliseconds)) + 1, cls.bucketCount - 1)
+
+    @staticmethod
+    def bucketLimit(bucket):
+        """
+        The upper limit of the durations in `bucket`, in seconds
+        """
+        return 2 ** bucket / 1000
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return self.total / self.count
+
+    def percentile(self, fraction):
+        """
+        An estimate of the duration that `fraction` of the operations
+        took less than, in seconds: the upper limit of its bucket.
+        """
+        if self.count == 0:
+            return 0
+
+        needed = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= needed:
+                return min(self.bucketLimit(bucket), self.max)
+        return self.max
+
+
+class _Span:
+    """
+    Records the time between entering and exiting it
+    """
+
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings, name):
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timings.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullSpan:
+    """
+    What a span is when timing is disabled: it does nothing at all
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_nullSpan = _NullSpan()
+
+
+class Timings:
+    """
+    Collects how long the major operations take, such as loading a
+    folder or decoding an image, into a `Histogram` per operation.
+
+    Operations are timed with a span:
+
+        with timings.span("Merge image"):
+            ...
+
+    or by decorating the function that performs them:
+
+        @timings.timed("Decode image")
+        def decode(fp):
+            ...
+
+    Operations that start and end in different places can `record` their
+    duration themselves. Spans are always in place, but only record
+    anything while `enabled` is set; otherwise they cost no more than
+    checking that flag. Spans can be used from any thread.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.since = datetime.now()
+
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def span(self, name):
+        if not self.enabled:
+            return _nullSpan
+        return _Span(self, name)
+
+    def timed(self, name):
+        """
+        Decorator that times each call of a function as `name`
+        """
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name, seconds):
+        """
+        Records that the operation `name` took `seconds`
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def histograms(self):
+        """
+        A copy of the histograms collected so far, by operation name
+        """
+        with self._lock:
+            return {name: h.copy() for name, h in self._histograms.items()}
+
+    def reset(self):
+        """
+        Forgets everything collected so far
+        """
+        with self._lock:
+            self._histograms = {}
+            self.since = datetime.now()
+
+    def report(self):
+        """
+        A human readable table of the timings collected so far
+        """
+        lines = [
+            f"ImageWAO timings since {self.since:%Y-%m-%d %H:%M:%S}",
+            "",
+            f"{'Operation':<24}{'Count':>8}{'Mean':>10}{'Median':>10}"
+            f"{'90%':>10}{'Max':>10}{'Total':>10}",
+        ]
+
+        for name, h in sorted(self.histograms().items()):
+            lines.append(
+                f"{name:<24}{h.count:>8}{formatSeconds(h.mean()):>10}"
+                f"{formatSeconds(h.percentile(0.5)):>10}"
+                f"{formatSeconds(h.percentile(0.9)):>10}"
+                f"{formatSeconds(h.max):>10}{formatSeconds(h.total):>10}"
+            )
+
+        lines.extend(["", "Histograms (operations per duration bucket):"])
+        for name, h in sorted(self.histograms().items()):
+            counts = ", ".join(
+                f"<{formatSeconds(Histogram.bucketLimit(b))}: {count}"
+                for b, count in enumerate(h.buckets)
+                if count
+            )
+            lines.append(f"{name}: {counts}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, folder=None):
+        """
+        Writes the `report` to a new log file in `folder`,
+        by default the log folder of the library. Returns its path.
+        """
+        if folder is None:
+            folder = config.logFolder()
+
+        fp = Path(folder) / f"timings-{datetime.now():%Y%m%d-%H%M%S}.log"
+        with open(fp, "w") as f:
+            f.write(self.report())
+        return fp
+
+
+def formatSeconds(seconds):
+    """
+    A duration in the unit that suits it best
+    """
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+timings = Timings()
@@ -1,3 +1,5 @@
+import copy
+
 from PySide2 import QtCore, QtGui
 
 from countdata import CountData
@@ -102,6 +104,18 @@ class DrawingData:
 
         return DrawingData(name, geom, pen, CountData.fromDict(countData))
 
+    def copy(self):
+        """
+        A copy of this drawing data, that can be offset
+        or scaled without changing the original.
+        """
+        return DrawingData(
+            self.name,
+            type(self.geom)(self.geom),
+            QtGui.QPen(self.pen),
+            copy.copy(self.countData),
+        )
+
     def offset(self, x, y):
         """
         Offset the geometry of this point by a given
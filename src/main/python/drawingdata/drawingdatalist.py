@@ -1,3 +1,4 @@
+import hashlib
 import json
 from typing import List
 
@@ -123,6 +124,13 @@ class DrawingDataList:
 
         return json.dumps(self.toDict())
 
+    def copy(self):
+        """
+        A copy of this list and of the drawings in it. Changing
+        the drawings of the copy does not change the original.
+        """
+        return DrawingDataList([drawing.copy() for drawing in self._drawingData])
+
     def toDict(self):
         """
         Returns the encoded drawing items as a JSON serializable dict
@@ -133,6 +141,23 @@ class DrawingDataList:
 
         return encoded
 
+    def digest(self):
+        """
+        A digest of the content of the drawings. Lists with the same
+        drawings in the same order have the same digest. It is the same
+        in every session, so it can be saved and compared later.
+        """
+        return DrawingDataList.DictDigest(self.toDict())
+
+    @staticmethod
+    def DictDigest(data: List[dict]):
+        """
+        The `digest` of the drawings encoded as `data` by `toDict`,
+        without decoding them
+        """
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
     def addToScene(self, scene: QtWidgets.QGraphicsScene):
         """
         Adds the internal geometries to a scene,
@@ -164,10 +189,13 @@ class DrawingDataList:
         Optionally include a scaling factor if
         you are painting to a different size than what
         the drawing was originally drawn on.
+        The drawings themselves are not changed.
         """
         painter = QtGui.QPainter(device)
         for drawing in self._drawingData:
-            drawing.scale(sf)
+            if sf != 1:
+                drawing = drawing.copy()
+                drawing.scale(sf)
             painter.setPen(drawing.pen)
             if drawing.name == "Rect":
                 painter.drawRect(drawing.geom)
@@ -0,0 +1,5 @@
+from .thumbnailcache import ThumbnailCache
+from .pixelbudget import PixelBudget, pixelBudget
+from .pixelcache import PixelCache, pixelCache
+
+__all__ = [ThumbnailCache, PixelBudget, pixelBudget, PixelCache, pixelCache]
@@ -0,0 +1,136 @@
+"""
+Keeps the memory used by decoded images within a budget.
+"""
+
+from collections import OrderedDict
+
+from base import config
+
+
+class PixelBudget:
+    """
+    Tracks the memory taken up by decoded pixel data, such as full
+    resolution images or scaled grid images, and frees the least
+    recently used data when the total goes over `config.pixelMemoryBudget`.
+
+    Each entry is keyed by its owner (e.g. a `FullImage`) and a `kind`
+    (e.g. "full"), and comes with an `evict` callable that drops the data.
+    Owners are expected to reload evicted data when it is needed again.
+
+    Entries also have a `tier`. Entries in lower tiers are evicted first,
+    so data that is expensive to lose (e.g. what is on screen) can be
+    put in a higher tier than data that is rarely needed.
+
+    Only use this from the GUI thread: eviction calls back into
+    the owners, which must not happen while another thread uses them.
+    """
+
+    def __init__(self):
+
+        # {(owner, kind): (numBytes, evict, tier)}, least recently used first
+        self._entries = OrderedDict()
+        self._kindsByOwner = {}
+        self._usage = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, owner, kind, numBytes: int, evict, tier=0):
+        """
+        Starts tracking (or updates) the data of `owner` of this `kind`.
+        Counts as a miss: the data had to be decoded or computed.
+        Frees other data if this puts the budget over its limit.
+        """
+        key = (owner, kind)
+        self.misses += 1
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._usage -= old[0]
+
+        self._entries[key] = (numBytes, evict, tier)
+        self._kindsByOwner.setdefault(owner, set()).add(kind)
+        self._usage += numBytes
+
+        self._evictOverBudget(keep=key)
+
+    def touch(self, owner, kind):
+        """
+        Marks the data of `owner` of this `kind` as just used.
+        Returns `True` (a hit) if it is tracked.
+        """
+        key = (owner, kind)
+        if key not in self._entries:
+            return False
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def remove(self, owner, kind=None):
+        """
+        Stops tracking the data of `owner` of this `kind`,
+        or all of its data if `kind` is None. Nothing is evicted.
+        """
+        kinds = self._kindsByOwner.get(owner, set())
+        if kind is not None:
+            kinds = kinds.intersection([kind])
+
+        for k in list(kinds):
+            numBytes, _, _ = self._entries.pop((owner, k))
+            self._usage -= numBytes
+            self._kindsByOwner[owner].discard(k)
+
+        if not self._kindsByOwner.get(owner, True):
+            del self._kindsByOwner[owner]
+
+    def _evictOverBudget(self, keep=None):
+        """
+        Evicts the least recently used data of the lowest tier until
+        the usage is within the budget. The entry `keep` is never evicted.
+        """
+        limit = config.pixelMemoryBudget * 1024 * 1024
+        if self._usage <= limit:
+            return
+
+        # Sorting is stable, so each tier stays least recently used first
+        byTier = sorted(self._entries.items(), key=lambda t: t[1][2])
+
+        for key, (_, evict, _) in byTier:
+            if self._usage <= limit:
+                break
+            if key == keep:
+                continue
+
+            owner, kind = key
+            self.remove(owner, kind)
+            evict()
+
+    def usage(self):
+        """
+        Number of bytes of pixel data currently tracked
+        """
+        return self._usage
+
+    def hitRate(self):
+        """
+        Fraction of lookups that found their data in memory
+        """
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0
+        return self.hits / lookups
+
+    def summary(self):
+        """
+        A human readable description of the memory use
+        """
+        usage = self._usage / 1024 / 1024
+        limit = config.pixelMemoryBudget
+        return (
+            f"Image memory: {usage:.0f} of {limit} MB "
+            f"({self.hitRate():.0%} hit rate)"
+        )
+
+
+pixelBudget = PixelBudget()
@@ -0,0 +1,225 @@
+"""
+On-disk cache of decoded full resolution images.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from pathlib import Path
+
+from PySide2 import QtGui
+
+from base import config
+
+
+class PixelCache:
+    """
+    Stores the decoded pixels of recently opened images, so that opening
+    them again skips decoding. Decoding a large JPEG takes much longer than
+    reading its pixels back from disk.
+
+    Each image is stored in a file of its own: a small header followed by
+    its RGB32 pixels, exactly as they are laid out in a `QImage`. `get`
+    reads them straight into the pixels of a new `QImage`.
+
+    Entries are keyed by the path, size and modification time of their
+    source image, so a changed image is never served from the cache.
+    The cache is shared by all transects and kept within
+    `config.pixelCacheLimit`; the least recently used images are removed
+    first. `get` and `put` can be called from several threads at once.
+    """
+
+    # magic, width, height, bytes per line, QImage format, padded to 32 bytes
+    _header = struct.Struct("<8s4I8x")
+    _magic = b"IWPIXEL1"
+    _suffix = ".rgb32"
+
+    def __init__(self, folder=None):
+        self._folder = None if folder is None else Path(folder)
+        self._lock = threading.Lock()
+
+    @property
+    def folder(self) -> Path:
+        if self._folder is None:
+            return config.pixelCacheFolder()
+        return self._folder
+
+    @staticmethod
+    def isEnabled():
+        return config.pixelCacheEnabled
+
+    def _entryPath(self, fp):
+        """
+        The cache file for the image at `fp`, or `None` if that
+        image cannot be read.
+        """
+        fp = Path(fp).resolve()
+        try:
+            stat = fp.stat()
+        except OSError:
+            return None
+
+        key = f"{fp}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")
+        return self.folder / (hashlib.sha1(key).hexdigest() + self._suffix)
+
+    def get(self, fp):
+        """
+        Retreives the decoded pixels of the image at `fp`.
+        Returns `None` if they are not cached.
+        """
+        entryPath = self._entryPath(fp)
+        if entryPath is None:
+            return None
+
+        headerSize = self._header.size
+        try:
+            with open(entryPath, "rb") as f:
+                header = f.read(headerSize)
+                if len(header) < headerSize:
+                    return None
+
+                magic, width, height, bytesPerLine, imageFormat = self._header.unpack(
+                    header
+                )
+                entrySize = os.fstat(f.fileno()).st_size
+                if (
+                    magic != self._magic
+                    or entrySize != headerSize + bytesPerLine * height
+                ):
+                    return None
+
+                image = QtGui.QImage(width, height, QtGui.QImage.Format(imageFormat))
+                if image.isNull() or image.bytesPerLine() != bytesPerLine:
+                    return None
+
+                # Read into pixels that the image owns, so that copies
+                # that Qt makes of it stay valid however long they live
+                if f.readinto(memoryview(image.bits())) != bytesPerLine * height:
+                    return None
+        except (OSError, ValueError):
+            return None
+
+        # The modification time of an entry is the last time it was used
+        try:
+            os.utime(entryPath)
+        except OSError:
+            pass
+
+        return image
+
+    def contains(self, fp):
+        """
+        Whether the decoded pixels of the image at `fp` are cached.
+        Nothing is read.
+        """
+        entryPath = self._entryPath(fp)
+        return entryPath is not None and entryPath.is_file()
+
+    def put(self, fp, image: QtGui.QImage):
+        """
+        Writes the decoded pixels of the image at `fp` to the cache,
+        then shrinks the cache to fit `config.pixelCacheLimit`.
+        """
+        entryPath = self._entryPath(fp)
+        if entryPath is None or image.isNull():
+            return
+
+        if image.format() != QtGui.QImage.Format_RGB32:
+            image = image.convertToFormat(QtGui.QImage.Format_RGB32)
+
+        header = self._header.pack(
+            self._magic,
+            image.width(),
+            image.height(),
+            image.bytesPerLine(),
+            int(image.format()),
+        )
+
+        # Written next to the entry first, so that a half written
+        # entry is never read, even if writing is interrupted
+        tempPath = entryPath.with_name(f"{entryPath.stem}.{threading.get_ident()}.tmp")
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            with open(tempPath, "wb") as f:
+                f.write(header)
+                f.write(image.constBits())
+            os.replace(tempPath, entryPath)
+        except OSError:
+            self._remove(tempPath)
+            return
+
+        self._enforceLimit()
+
+    def _entries(self):
+        """
+        All cache files as (path, stat) tuples, least recently used first.
+        """
+        entries = []
+        try:
+            paths = list(self.folder.iterdir())
+        except OSError:
+            return entries
+
+        for fp in paths:
+            if fp.suffix != self._suffix:
+                continue
+            try:
+                entries.append((fp, fp.stat()))
+            except OSError:
+                continue
+
+        entries.sort(key=lambda t: t[1].st_mtime_ns)
+        return entries
+
+    def sizeOnDisk(self):
+        """
+        Number of bytes taken up by the cached images
+        """
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _enforceLimit(self):
+        """
+        Removes the least recently used images until the cache fits
+        within `config.pixelCacheLimit`. Returns the number removed.
+        """
+        limit = config.pixelCacheLimit * 1024 * 1024
+        removed = 0
+
+        with self._lock:
+            entries = self._entries()
+            total = sum(stat.st_size for _, stat in entries)
+            for fp, stat in entries:
+                if total <= limit:
+                    break
+                if self._remove(fp):
+                    total -= stat.st_size
+                    removed += 1
+
+        return removed
+
+    def clear(self):
+        """
+        Removes every image in the cache
+        """
+        with self._lock:
+            for fp, _ in self._entries():
+                self._remove(fp)
+
+    @staticmethod
+    def _remove(fp: Path):
+        """
+        Removes the file at `fp`. Returns whether it is gone.
+        Files that are open cannot be removed on every
+        platform, those are left for a later attempt.
+        """
+        try:
+            fp.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
+
+pixelCache = PixelCache()
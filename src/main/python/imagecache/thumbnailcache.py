@@ -0,0 +1,293 @@
+"""
+On-disk cache of the reduced resolution images shown in the image grid.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from PySide2 import QtCore, QtGui
+
+from base import config
+
+
+class ThumbnailCache:
+    """
+    Stores the grid thumbnail of each image in a transect folder,
+    in the thumbnail folder next to the `.marked` folder.
+
+    Thumbnails are keyed by the name of the image they were made from,
+    and are only valid as long as the size and modification time of
+    that image do not change.
+
+    The index of cached thumbnails is kept in memory and written
+    to disk with `flush`. `get`, `put` and `flush` can be called
+    from several threads at once, such as the loading threads and
+    a prefetch that is still finishing.
+    """
+
+    # Thumbnails are re-encoded as JPEGs at this quality
+    quality = 90
+
+    def __init__(self, transectFolder):
+        self.transectFolder = Path(transectFolder)
+        self.folder = config.thumbnailFolder(self.transectFolder)
+        self.indexFile = config.thumbnailIndexFile(self.transectFolder)
+
+        self._lock = threading.Lock()
+        self._index = self._readIndex()
+        self._dirty = False
+
+    def _readIndex(self):
+        """
+        Reads the index file. A missing or unreadable index
+        is treated as an empty cache.
+        """
+        try:
+            with open(self.indexFile, "r") as f:
+                return json.load(f)
+        except (OSError, json.decoder.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _sourceStamp(fp: Path):
+        """
+        The size and modification time of a source image,
+        or `None` if it cannot be read.
+        """
+        try:
+            stat = fp.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _thumbnailPath(self, imageName):
+        return self.folder / imageName
+
+    def _isValid(self, imageName, entry):
+        """
+        Whether the cached entry still matches the source image
+        and its thumbnail file still exists.
+        """
+        stamp = self._sourceStamp(self.transectFolder / imageName)
+        if stamp is None:
+            return False
+        if stamp != (entry["fileSize"], entry["mtime"]):
+            return False
+        return self._thumbnailPath(imageName).is_file()
+
+    def get(self, fp, thumbnailWidth: int):
+        """
+        Retreives the cached thumbnail of the image at `fp`.
+        Returns a tuple (thumbnail: QImage, size: QSize), where `size`
+        is the size of the full resolution image.
+        Returns `None` if there is no valid entry `thumbnailWidth` wide.
+        """
+        imageName = Path(fp).name
+
+        with self._lock:
+            entry = self._index.get(imageName)
+
+        if entry is None or entry["thumbnailWidth"] != thumbnailWidth:
+            return None
+
+        if not self._isValid(imageName, entry):
+            return None
+
+        thumbnail = QtGui.QImage(str(self._thumbnailPath(imageName)))
+        if thumbnail.isNull():
+            return None
+
+        with self._lock:
+            entry["accessed"] = time.time()
+            self._dirty = True
+
+        return thumbnail, QtCore.QSize(entry["width"], entry["height"])
+
+    def contains(self, fp, thumbnailWidth: int):
+        """
+        Whether there is a valid thumbnail of the image at `fp`
+        that is `thumbnailWidth` wide. Nothing is decoded.
+        """
+        imageName = Path(fp).name
+
+        with self._lock:
+            entry = self._index.get(imageName)
+
+        if entry is None or entry["thumbnailWidth"] != thumbnailWidth:
+            return False
+
+        return self._isValid(imageName, entry)
+
+    def sourceSize(self, fp):
+        """
+        The size of the full resolution image at `fp`, if it has
+        a valid entry in the cache. Otherwise `None`.
+        """
+        imageName = Path(fp).name
+
+        with self._lock:
+            entry = self._index.get(imageName)
+
+        if entry is None or not self._isValid(imageName, entry):
+            return None
+
+        return QtCore.QSize(entry["width"], entry["height"])
+
+    def put(self, fp, size: QtCore.QSize, thumbnail: QtGui.QImage):
+        """
+        Writes the `thumbnail` of the image at `fp` to the cache.
+        `size` is the size of the full resolution image.
+        """
+        fp = Path(fp)
+        stamp = self._sourceStamp(fp)
+        if stamp is None or thumbnail.isNull():
+            return
+
+        # Written next to the thumbnail first, so that a half
+        # written thumbnail is never read
+        self.folder.mkdir(parents=True, exist_ok=True)
+        thumbnailPath = self._thumbnailPath(fp.name)
+        tempPath = self._tempPath(thumbnailPath)
+        if not thumbnail.save(str(tempPath), "JPG", self.quality):
+            self._remove(tempPath)
+            return
+        try:
+            os.replace(tempPath, thumbnailPath)
+        except OSError:
+            self._remove(tempPath)
+            return
+
+        entry = {
+            "fileSize": stamp[0],
+            "mtime": stamp[1],
+            "width": size.width(),
+            "height": size.height(),
+            "thumbnailWidth": thumbnail.width(),
+            "bytes": thumbnailPath.stat().st_size,
+            "accessed": time.time(),
+        }
+
+        with self._lock:
+            self._index[fp.name] = entry
+            self._dirty = True
+
+    def check(self):
+        """
+        Returns the names of the images whose cached thumbnails are
+        out of date, or whose source image no longer exists.
+        """
+        with self._lock:
+            entries = list(self._index.items())
+        return [name for name, entry in entries if not self._isValid(name, entry)]
+
+    def prune(self):
+        """
+        Removes out of date entries and thumbnail files that are not in
+        the index, then shrinks the cache to fit `config.thumbnailCacheLimit`.
+        Returns the number of thumbnails removed.
+        """
+        stale = self.check()
+        with self._lock:
+            for imageName in stale:
+                self._index.pop(imageName, None)
+            known = set(self._index.keys()).union(stale)
+            self._dirty = True
+
+        orphans = []
+        if self.folder.is_dir():
+            orphans = [
+                fp
+                for fp in self.folder.iterdir()
+                if fp.name not in known and fp != self.indexFile
+            ]
+
+        for imageName in stale:
+            self._remove(self._thumbnailPath(imageName))
+        for fp in orphans:
+            self._remove(fp)
+
+        return len(stale) + len(orphans) + self._enforceLimit()
+
+    def clear(self):
+        """
+        Removes every thumbnail in this cache. The cache will be
+        rebuilt the next time the transect is loaded.
+        """
+        with self._lock:
+            names = list(self._index.keys())
+            self._index = {}
+            self._dirty = False
+
+        for imageName in names:
+            self._remove(self._thumbnailPath(imageName))
+        self._remove(self.indexFile)
+
+    def sizeOnDisk(self):
+        """
+        Number of bytes taken up by the cached thumbnails
+        """
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._index.values())
+
+    def _enforceLimit(self):
+        """
+        Removes the least recently used thumbnails until the cache fits
+        within `config.thumbnailCacheLimit`. Returns the number removed.
+        """
+        limit = config.thumbnailCacheLimit * 1024 * 1024
+        removed = []
+
+        with self._lock:
+            total = sum(entry["bytes"] for entry in self._index.values())
+            byAge = sorted(self._index.items(), key=lambda t: t[1]["accessed"])
+            for imageName, entry in byAge:
+                if total <= limit:
+                    break
+                total -= entry["bytes"]
+                del self._index[imageName]
+                removed.append(imageName)
+            if removed:
+                self._dirty = True
+
+        for imageName in removed:
+            self._remove(self._thumbnailPath(imageName))
+
+        return len(removed)
+
+    def flush(self):
+        """
+        Shrinks the cache to its size limit and writes the index to disk.
+        """
+        self._enforceLimit()
+
+        with self._lock:
+            if not self._dirty:
+                return
+            index = dict(self._index)
+            self._dirty = False
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tempPath = self._tempPath(self.indexFile)
+        try:
+            with open(tempPath, "w") as f:
+                json.dump(index, f)
+            os.replace(tempPath, self.indexFile)
+        except OSError:
+            self._remove(tempPath)
+
+    @staticmethod
+    def _tempPath(fp: Path):
+        """
+        A file next to `fp` for the current thread to write it to first
+        """
+        return fp.with_name(f".{fp.name}.{threading.get_ident()}.tmp")
+
+    @staticmethod
+    def _remove(fp: Path):
+        try:
+            fp.unlink()
+        except FileNotFoundError:
+            pass
@@ -2,13 +2,14 @@ from pathlib import Path
 
 from PySide2 import QtGui, QtCore, QtWidgets
 
-from base import ctx
+from base import config, ctx, timings
+from imagecache import pixelBudget
 from migrator import Migrator
+from tools import Autosaver
 from ui import (
     DockWidget,
     TitleBarText,
     StatusBar,
-    LoadingOverlay,
     Notifier,
     Library,
     FlightImportWizard,
@@ -20,6 +21,7 @@ from ui import (
     MigrationLogForm,
     DistributionForm,
     PreferencesDialog,
+    TimingsForm,
 )
 
 QtCore.QCoreApplication.setOrganizationName("Namibia WAO")
@@ -34,12 +36,19 @@ class QImageWAO(QtWidgets.QMainWindow):
         # Read build settings
         self.version = ctx.build_settings["version"]
 
+        # Timings are recorded from the start, if they are turned on
+        timings.enabled = config.recordTimings
+
         # Migrate if necessary
         Migrator().migrate()
 
         # Whether or not the application has changes
         self._dirty = False
 
+        # Changes are saved a while after they are made, if turned on
+        self.autosaver = Autosaver(config.autosaveDelay, parent=self)
+        self.autosaver.saveRequested.connect(self._autosave)
+
         # Window icon
         self.setWindowIcon(ctx.icon("icons/winIcon.png"))
 
@@ -58,6 +67,7 @@ class QImageWAO(QtWidgets.QMainWindow):
         self.flightInfoForm = FlightInfoForm.CreateWithApplyCancel()
         self.migrationLogForm = MigrationLogForm()
         self.distributionForm = DistributionForm()
+        self.timingsForm = TimingsForm()
 
         # Dock widget creation
         self._addDockWidget(
@@ -102,6 +112,14 @@ class QImageWAO(QtWidgets.QMainWindow):
             startVisible=False,
             startFloating=True,
         )
+        self.timingsDock = self._addDockWidget(
+            self.timingsForm,
+            ctx.defaultDockIcon,
+            "Timings",
+            startArea=QtCore.Qt.BottomDockWidgetArea,
+            startVisible=False,
+            startFloating=True,
+        )
 
         # Event filters
         self.library.installEventFilter(self)
@@ -112,10 +130,6 @@ class QImageWAO(QtWidgets.QMainWindow):
         # Status bar
         self.setStatusBar(StatusBar(self))
 
-        # Loading overlay screen
-        self.loadingOverlay = LoadingOverlay(self)
-        self.loadingOverlay.hide()
-
         # Send initializing signals
         self.countTotals.readDirectory(self.library.rootPath)
 
@@ -128,19 +142,24 @@ class QImageWAO(QtWidgets.QMainWindow):
         self.library.showFlightInfoRequested.connect(self._showFlightInfoDock)
         self.library.showMigrationLogRequested.connect(self._showMigrationLogDock)
         self.library.showDistributionFormRequested.connect(self._showDistributionDock)
+        self.library.rebuildThumbnailsRequested.connect(
+            self.imageGridView.rebuildThumbnails
+        )
+        self.library.exportMarkedImagesRequested.connect(self._exportMarkedImages)
 
         # Image grid signal connections
-        self.imageGridView.loadProgress.connect(self.loadingOverlay.setProgress)
-        self.imageGridView.loadFinished.connect(self.loadingOverlay.fadeOut)
         self.imageGridView.selectedImageChanged.connect(self.imageViewer.setImage)
         self.imageGridView.selectedFilesChanged.connect(self.library.selectFiles)
         self.imageGridView.notificationMessage.connect(self.notifier.notify)
         self.imageGridView.statusMessage.connect(self.showStatusMessage)
         self.imageGridView.countDataChanged.connect(self.countTotals.setTransectData)
+        self.imageGridView.autosaveFailed.connect(self._markAsDirty)
 
         # Image viewer signal connections
         self.imageViewer.drawnItemsChanged.connect(self.imageGridView.setDrawings)
         self.imageViewer.drawnItemsChanged.connect(self._markAsDirty)
+        self.imageViewer.drawnItemsChanged.connect(self.autosaver.changed)
+        self.autosaver.idle.connect(self.imageGridView.writeMarkedImages)
 
         # Count totals form connections
         self.countTotals.fileActivated.connect(self.imageGridView.selectFile)
@@ -153,6 +172,8 @@ class QImageWAO(QtWidgets.QMainWindow):
         self.flightInfoForm.closeRequested.connect(self.flightInfoDock.hide)
         self.migrationLogForm.closeRequested.connect(self.migrationLogDock.hide)
         self.distributionForm.closeRequested.connect(self.distributionDock.hide)
+        self.timingsForm.closeRequested.connect(self.timingsDock.hide)
+        self.timingsForm.statusMessage.connect(self.showStatusMessage)
 
         # File | Etc. Menus
         fileMenu = self._createFileMenu()
@@ -255,6 +276,17 @@ class QImageWAO(QtWidgets.QMainWindow):
     def _createInfoMenu(self) -> QtWidgets.QMenu:
         menu = QtWidgets.QMenu("&Info", self)
         menu.addAction(QtWidgets.QAction(f"Version: {self.version}", self))
+
+        a = QtWidgets.QAction("Image memory", self)
+        a.triggered.connect(
+            lambda: self.showStatusMessage((pixelBudget.summary(), 10000))
+        )
+        menu.addAction(a)
+
+        a = QtWidgets.QAction("Timings", self)
+        a.triggered.connect(self.timingsDock.show)
+        menu.addAction(a)
+
         return menu
 
     def _saveIfDirty(self):
@@ -266,9 +298,36 @@ class QImageWAO(QtWidgets.QMainWindow):
         All save operations. Once saving is completed,
         The application will be marked clean.
         """
+        self.autosaver.cancel()
         self.imageGridView.save()
         self._markAsClean()
 
+    @QtCore.Slot(str)
+    def _exportMarkedImages(self, transectFolder: str):
+        """
+        Asks where to export the marked images of a transect to, and
+        composites them there from the images and their saved drawings.
+        """
+        destination = QtWidgets.QFileDialog().getExistingDirectory(
+            self,
+            f"Export marked images of {Path(transectFolder).name}",
+            transectFolder,
+            QtWidgets.QFileDialog().ShowDirsOnly,
+        )
+
+        if not destination == "":
+            self.imageGridView.exportMarkedImages(transectFolder, destination)
+
+    @QtCore.Slot()
+    def _autosave(self):
+        """
+        Saves the changes in the background. Marked images
+        are left until the user takes a break.
+        """
+        if self._dirty:
+            self.imageGridView.autosave()
+            self._markAsClean()
+
     def _markAsDirty(self, *args):
         """
         Any signals that signify save-able changes were made
@@ -340,6 +399,11 @@ class QImageWAO(QtWidgets.QMainWindow):
         """
         self._exitDirectoryEvent(event)
 
+        # Write what was left for later, and leave
+        # the save file readable without its journal
+        if event.isAccepted():
+            self.imageGridView.finishSaving()
+
     @QtCore.Slot()
     def _raiseError(self):
         raise RuntimeError("this is a problem")
@@ -348,3 +412,5 @@ class QImageWAO(QtWidgets.QMainWindow):
     def _showPreferencesForm(self):
         dialog = PreferencesDialog(self)  # shares taskbar entry and is centered on self
         dialog.exec_()
+        self.imageGridView.setTiling(config.gridRows, config.gridColumns)
+        self.autosaver.setDelay(config.autosaveDelay)
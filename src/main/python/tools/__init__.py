@@ -1,6 +1,7 @@
 from .layout import clearLayout
 from .files import showInFolder, DirectoryValidator, FileNameValidator
-from .saving import saveManyImages
+from .saving import ImageSaver
+from .autosaver import Autosaver
 from .numbers import roundToMultiple
 
 __all__ = [
@@ -8,6 +9,7 @@ __all__ = [
     showInFolder,
     DirectoryValidator,
     FileNameValidator,
-    saveManyImages,
+    ImageSaver,
+    Autosaver,
     roundToMultiple,
 ]
@@ -0,0 +1,65 @@
+from PySide2 import QtCore
+
+
+class Autosaver(QtCore.QObject):
+    """
+    Decides when changes are saved automatically.
+
+    Every change restarts the countdown to `saveRequested`, so a burst
+    of changes is saved once, `delay` seconds after the last of them.
+    `idle` follows when there have been no changes for `idleDelay`
+    seconds after that, for saving work that can wait until the user
+    pauses. A delay of 0 turns autosaving off.
+    """
+
+    saveRequested = QtCore.Signal()
+    idle = QtCore.Signal()
+
+    def __init__(self, delay: int, idleDelay: int = 60, parent=None):
+        super().__init__(parent)
+
+        self._saveTimer = QtCore.QTimer(self)
+        self._saveTimer.setSingleShot(True)
+        self._saveTimer.timeout.connect(self._save)
+
+        self._idleTimer = QtCore.QTimer(self)
+        self._idleTimer.setSingleShot(True)
+        self._idleTimer.setInterval(idleDelay * 1000)
+        self._idleTimer.timeout.connect(self.idle.emit)
+
+        self.setDelay(delay)
+
+    def delay(self):
+        return self._delay
+
+    def setDelay(self, seconds: int):
+        self._delay = seconds
+        self._saveTimer.setInterval(seconds * 1000)
+        if seconds == 0:
+            self.cancel()
+
+    @QtCore.Slot()
+    def changed(self, *args):
+        """
+        Notes that a change was made, which will be saved
+        once no more changes are made for a while
+        """
+        if self._delay == 0:
+            return
+
+        self._idleTimer.stop()
+        self._saveTimer.start()
+
+    @QtCore.Slot()
+    def cancel(self):
+        """
+        Forgets about the changes made so far,
+        for instance because they were saved.
+        """
+        self._saveTimer.stop()
+        self._idleTimer.stop()
+
+    @QtCore.Slot()
+    def _save(self):
+        self.saveRequested.emit()
+        self._idleTimer.start()
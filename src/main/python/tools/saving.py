@@ -1,9 +1,169 @@
-def saveManyImages(saveObjects: list):
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+
+from PySide2 import QtCore
+
+from base import QWorker, timings
+
+
+def _writeImage(path: Path, render):
     """
-    Saves many images in a multiprocessed fashion.
-    `saveObjects`: list of tuples (object, [args]) where the
-    object implements a `save` method, accepting `*[args]`
-    as the parameter.
+    Renders an image and writes it to `path`. The image is written
+    next to `path` first, so a failed write never leaves a broken
+    file behind, nor replaces one that was written before.
+
+    `render` returns either a QImage, which is encoded in the format
+    of the suffix of `path`, or the `bytes` of an encoded image.
     """
-    for img, args in saveObjects:
-        img.save(*args)
+    with timings.span("Write marked image"):
+        image = render()
+        if not isinstance(image, bytes) and image.isNull():
+            raise ValueError(f"There is no image to save to {path.name}")
+
+        tempPath = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            if isinstance(image, bytes):
+                with open(tempPath, "wb") as f:
+                    f.write(image)
+            elif not image.save(str(tempPath), path.suffix.lstrip(".")):
+                raise OSError(f"Could not write {path.name}")
+            os.replace(tempPath, path)
+        finally:
+            try:
+                tempPath.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ImageSaver(QtCore.QObject):
+    """
+    Writes images to disk on a pool of threads.
+
+    Each image is given as a `render` function that creates it,
+    along with the number of bytes it is expected to take up.
+    Images are only rendered right before they are written, and no
+    more images are started than fit within `maxBytes` together
+    (one image is always allowed), so the memory used by saving
+    stays bounded however many images are saved.
+
+    Images that fail to save are reported with `failed`,
+    the rest are saved regardless.
+    """
+
+    progress = QtCore.Signal(int, int, str)  # written or failed, total, path
+    failed = QtCore.Signal(str, str)  # path, reason
+    finished = QtCore.Signal(int, list)  # saved, [(path, reason)]
+
+    def __init__(self, threadpool: QtCore.QThreadPool, maxBytes: int):
+        super().__init__()
+
+        self.maxBytes = maxBytes
+        self._threadpool = threadpool
+
+        # Images waiting to be written: {path: (render, numBytes)}
+        self._pending = OrderedDict()
+
+        # Workers that are currently running, keyed by their signals
+        # object. Holding the reference keeps the worker alive.
+        self._running = {}
+        self._runningBytes = 0
+
+        self._done = 0
+        self._total = 0
+        self._failures = []
+
+    def save(self, path, render, numBytes: int):
+        """
+        Queues the image that `render()` returns to be written to `path`.
+        `render` is called on a worker thread. It replaces any image
+        queued for the same path that has not been started yet.
+        """
+        path = Path(path)
+        if self._pending.pop(path, None) is None:
+            self._total += 1
+
+        self._pending[path] = (render, numBytes)
+        self._startNext()
+
+    def discard(self, path):
+        """
+        Stops the image queued for `path` from being written,
+        unless it is being written already.
+        """
+        if self._pending.pop(Path(path), None) is not None:
+            self._total -= 1
+            self._finishIfDone()
+
+    def isSaving(self):
+        return bool(self._pending or self._running)
+
+    def waitForDone(self):
+        """
+        Blocks until every queued image is written. Images are started
+        from the event loop, so events are processed while waiting.
+        """
+        while self.isSaving():
+            QtCore.QCoreApplication.processEvents()
+            self._threadpool.waitForDone(10)
+
+    def _writingPaths(self):
+        return {path for _, path, _ in self._running.values()}
+
+    def _startNext(self):
+        """
+        Starts writing as many of the queued images
+        as there are threads and memory for
+        """
+        writing = self._writingPaths()
+
+        for path in list(self._pending):
+            if len(self._running) >= max(1, self._threadpool.maxThreadCount()):
+                return
+
+            # Writes of the same file must not overlap
+            if path in writing:
+                continue
+
+            render, numBytes = self._pending[path]
+            if self._running and self._runningBytes + numBytes > self.maxBytes:
+                return
+
+            del self._pending[path]
+            worker = QWorker(_writeImage, [path, render])
+            worker.signals.error.connect(partial(self._imageFailed, worker.signals))
+            worker.signals.finished.connect(
+                partial(self._imageFinished, worker.signals)
+            )
+            self._running[worker.signals] = (worker, path, numBytes)
+            self._runningBytes += numBytes
+            writing.add(path)
+            self._threadpool.start(worker)
+
+    def _imageFailed(self, signals, error):
+        _, path, _ = self._running[signals]
+        _, value, _ = error
+        self._failures.append((str(path), str(value)))
+        self.failed.emit(str(path), str(value))
+
+    def _imageFinished(self, signals):
+        _, path, numBytes = self._running.pop(signals)
+        self._runningBytes -= numBytes
+        self._done += 1
+        self.progress.emit(self._done, self._total, str(path))
+
+        self._startNext()
+        self._finishIfDone()
+
+    def _finishIfDone(self):
+        if self.isSaving():
+            return
+
+        saved = self._done - len(self._failures)
+        failures = self._failures
+        self._done = 0
+        self._total = 0
+        self._failures = []
+        self.finished.emit(saved, failures)
@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 from typing import Dict
 
@@ -11,8 +12,18 @@ class TransectData:
     Manages transect save data in a primitive
     data state, such that it can be easily
     serialized.
+
+    Save data is kept in two files: the save file itself, and a journal
+    next to it that changes are appended to (see `save`). `load` replays
+    the journal on top of the save file, so readers never need to know
+    about it. Once the journal grows as large as the save file, it is
+    compacted: the save file is rewritten and the journal is removed.
     """
 
+    # Journals smaller than this are never compacted, however
+    # small the save file is
+    minCompactSize = 64 * 1024
+
     def __init__(self, transectData: Dict[str, Dict[str, list]], fp: Path):
         """
         {
@@ -23,7 +34,8 @@ class TransectData:
                     DrawingData1.toDict(),
                     DrawingData2.toDict(),
                     ...
-                ]
+                ],
+                "drawingsDigest": DrawingDataList.digest()
             }
         }
 
@@ -32,11 +44,24 @@ class TransectData:
         self._transectData: Dict[str, Dict[str, list]] = transectData
         self.fp = fp
 
+        # Names of the images whose drawings changed since
+        # the data was loaded or last written (an ordered set)
+        self._changed = {}
+
+    @staticmethod
+    def JournalFile(fp) -> Path:
+        """
+        The journal of the save file at `fp`
+        """
+        fp = Path(fp)
+        return fp.with_name(fp.name + ".journal")
+
     @staticmethod
     def load(fp):
         """
-        Loads a serialized file. If the data cannot be decoded,
-        The save data is initialized with a blank dict.
+        Loads a serialized file and replays its journal.
+        If the data cannot be decoded, The save data is
+        initialized with a blank dict.
         """
         try:
             with open(fp, "r") as f:
@@ -47,15 +72,146 @@ class TransectData:
             )
             data = {}
 
-        return TransectData(data, fp)
+        transectData = TransectData(data, fp)
+        transectData._replayJournal()
+        return transectData
+
+    def _replayJournal(self):
+        """
+        Applies the changes recorded in the journal of `fp`, in order
+        """
+        try:
+            f = open(self.JournalFile(self.fp), "r")
+        except FileNotFoundError:
+            return
+
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    # Only the last record can be broken, by an
+                    # append that was interrupted. It was never saved.
+                    break
+
+                if record["drawings"] is None:
+                    self.removeDrawings(record["image"])
+                else:
+                    self.addImage(record["image"])
+                    imageData = self._transectData[record["image"]]
+                    imageData["drawings"] = record["drawings"]
+                    imageData["drawingsDigest"] = record.get("digest")
+
+        self._changed = {}
 
     def dump(self, fp):
         """
         Serialize save data and save to specified path.
-        Writes this data on top of already existing data.
+        Writes this data on top of already existing data,
+        and removes the journal, which is now part of it.
         """
-        with open(fp, "w") as f:
+        fp = Path(fp)
+
+        # Replaced in one go, so the save file is never half written
+        tempPath = fp.with_name(fp.name + ".tmp")
+        with open(tempPath, "w") as f:
             json.dump(self._transectData, f, indent=4)
+        os.replace(tempPath, fp)
+
+        try:
+            self.JournalFile(fp).unlink()
+        except FileNotFoundError:
+            pass
+
+        self._changed = {}
+
+    def save(self, fp):
+        """
+        Saves the changes made since the data was loaded or last saved,
+        by appending them to the journal of the save file at `fp`.
+        The time this takes depends on the size of the changes only.
+
+        The save file is rewritten instead if it does not exist yet,
+        or if the journal has grown as large as the save file.
+        Either way, this data must have been loaded from `fp`.
+        """
+        fp = Path(fp)
+        if not fp.exists():
+            self.dump(fp)
+            return
+
+        if self._changed:
+            records = []
+            for imageName in self._changed:
+                imageData = self._transectData.get(imageName, {})
+                record = {
+                    "image": imageName,
+                    "drawings": imageData.get("drawings"),
+                    "digest": imageData.get("drawingsDigest"),
+                }
+                records.append(json.dumps(record))
+
+            with open(self.JournalFile(fp), "a") as f:
+                f.write("\n".join(records) + "\n")
+
+            self._changed = {}
+
+        if self.needsCompacting(fp):
+            self.dump(fp)
+
+    def hasChanges(self):
+        """
+        Whether there are changes that `save` has not saved yet
+        """
+        return bool(self._changed)
+
+    def snapshot(self):
+        """
+        A copy of this data that can be saved on another thread, while
+        this data keeps being changed. The changes made so far move to
+        the copy: they are saved when the copy is.
+        """
+        copy = TransectData(
+            {name: dict(data) for name, data in self._transectData.items()}, self.fp
+        )
+        copy._changed = self._changed
+        self._changed = {}
+        return copy
+
+    def restoreChanges(self, snapshot):
+        """
+        Takes back the changes of `snapshot` that it could not save,
+        so they are saved the next time this data is.
+        """
+        for imageName in snapshot._changed:
+            self._changed.setdefault(imageName, None)
+        snapshot._changed = {}
+
+    @classmethod
+    def needsCompacting(cls, fp):
+        """
+        Whether the journal of the save file at `fp` has grown large enough
+        that replaying it costs more than rewriting the save file would
+        """
+        try:
+            journalSize = cls.JournalFile(fp).stat().st_size
+        except FileNotFoundError:
+            return False
+
+        try:
+            saveSize = Path(fp).stat().st_size
+        except FileNotFoundError:
+            saveSize = 0
+
+        return journalSize >= max(saveSize, cls.minCompactSize)
+
+    @staticmethod
+    def Compact(fp):
+        """
+        Merges the journal of the save file at `fp` into it, if it has one
+        """
+        if TransectData.JournalFile(fp).exists():
+            TransectData.load(fp).dump(fp)
 
     def addImage(self, imageName):
         """
@@ -76,8 +232,14 @@ class TransectData:
         # Ensure image name is present
         self.addImage(imageName)
 
-        # Add these drawings the image dict
-        self._transectData[imageName]["drawings"] = drawings.toDict()
+        # Add these drawings the image dict, along with their digest
+        # so they can be compared without decoding them
+        data = drawings.toDict()
+        self._transectData[imageName]["drawings"] = data
+        self._transectData[imageName]["drawingsDigest"] = DrawingDataList.DictDigest(
+            data
+        )
+        self._changed[imageName] = None
 
     def removeDrawings(self, imageName: str):
         """
@@ -90,11 +252,15 @@ class TransectData:
             # There might not have been this data saved yet
             except KeyError:
                 pass
+            else:
+                self._transectData[imageName].pop("drawingsDigest", None)
+                self._changed[imageName] = None
 
     def imageHasDrawings(self, imageName: str, otherDrawings: DrawingDataList):
         """
         Compares the drawings associated with `imageName`,
         and returns `True` if those drawings match `otherDrawings`.
+        The drawings are compared by their digests.
         """
 
         # Check if image has no drawings or data
@@ -102,15 +268,18 @@ class TransectData:
             return False
 
         # Check if image has no drawings
-        if "drawings" not in self._transectData[imageName].keys():
+        imageData = self._transectData[imageName]
+        if "drawings" not in imageData.keys():
             return False
 
-        # Check if image drawings are the same as the input
-        # also lol TODO stop this maddness
-        drawings = DrawingDataList.loads(
-            json.dumps(self._transectData[imageName]["drawings"])
-        )
-        return drawings == otherDrawings
+        # Drawings saved before digests were have
+        # theirs computed the first time it is needed
+        digest = imageData.get("drawingsDigest")
+        if digest is None:
+            digest = DrawingDataList.DictDigest(imageData["drawings"])
+            imageData["drawingsDigest"] = digest
+
+        return digest == otherDrawings.digest()
 
     def drawings(self):
         """
@@ -1,7 +1,6 @@
 from .dockwidget import DockWidget
 from .titlebartext import TitleBarText
 from .statusbar import StatusBar
-from .overlays import LoadingOverlay
 from .progressbar import QAbsoluteProgressBar
 from .notifications import Notifier
 from .library import Library
@@ -13,12 +12,12 @@ from .counttotals import CountTotals
 from .doyouwanttosave import DoYouWantToSave
 from .distribution import DistributionForm
 from .preferences import PreferencesDialog
+from .diagnostics import TimingsForm
 
 __all__ = [
     DockWidget,
     TitleBarText,
     StatusBar,
-    LoadingOverlay,
     QAbsoluteProgressBar,
     Notifier,
     Library,
@@ -32,4 +31,5 @@ __all__ = [
     MigrationLogForm,
     DistributionForm,
     PreferencesDialog,
+    TimingsForm,
 ]
@@ -4,7 +4,7 @@ from typing import Tuple, List
 from PySide2 import QtCore, QtWidgets
 
 from transectdata import TransectDataGroupList, GetSaveFiles
-from base import config
+from base import config, timings
 
 from .enums import UserRoles
 
@@ -79,6 +79,7 @@ class TotalsModel(QtCore.QAbstractListModel):
     def refresh(self):
         self.readDirectory(self._parentDir)
 
+    @timings.timed("Read totals")
     def readDirectory(self, fp):
         """ Populates model from directory. `fp`: any Path()-able type"""
         self._parentDir = str(fp)
@@ -0,0 +1,3 @@
+from .timingsform import TimingsForm
+
+__all__ = [TimingsForm]
@@ -0,0 +1,138 @@
+import math
+
+from PySide2 import QtWidgets, QtCore
+
+from base import config, timings
+from base.timing import Histogram, formatSeconds
+
+
+class TimingsForm(QtWidgets.QWidget):
+    """
+    Shows how long the major operations took since timings were
+    last reset, and exports them to a log file to send along
+    with a report of the application being slow.
+    """
+
+    closeRequested = QtCore.Signal()
+    statusMessage = QtCore.Signal(tuple)
+
+    # Characters that draw the histogram bars, from empty to full
+    _bars = " ▁▂▃▄▅▆▇█"
+
+    _columns = ["Operation", "Count", "Mean", "Median", "90%", "Max", "Histogram"]
+
+    def __init__(self):
+        super().__init__()
+
+        self.recordBox = QtWidgets.QCheckBox("Record timings")
+        self.recordBox.setToolTip(
+            "Record how long loading, decoding, merging and saving images take"
+        )
+        self.recordBox.setChecked(timings.enabled)
+        self.recordBox.toggled.connect(self._setRecording)
+
+        self.table = QtWidgets.QTableWidget(0, len(self._columns))
+        self.table.setHorizontalHeaderLabels(self._columns)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        buttonBox = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok)
+        resetButton = buttonBox.addButton("Reset", QtWidgets.QDialogButtonBox.ResetRole)
+        exportButton = buttonBox.addButton(
+            "Export to log", QtWidgets.QDialogButtonBox.ActionRole
+        )
+        buttonBox.accepted.connect(self.accept)
+        resetButton.clicked.connect(self._reset)
+        exportButton.clicked.connect(self._export)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.recordBox)
+        layout.addWidget(self.table)
+        layout.addWidget(buttonBox)
+        self.setLayout(layout)
+
+        # Refreshed while shown, so new timings show up as they come in
+        self._refreshTimer = QtCore.QTimer(self)
+        self._refreshTimer.setInterval(1000)
+        self._refreshTimer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self._refreshTimer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._refreshTimer.stop()
+        super().hideEvent(event)
+
+    @QtCore.Slot()
+    def accept(self):
+        self.closeRequested.emit()
+
+    @QtCore.Slot(bool)
+    def _setRecording(self, record):
+        timings.enabled = record
+        config.recordTimings = record
+
+    @QtCore.Slot()
+    def _reset(self):
+        timings.reset()
+        self.refresh()
+
+    @QtCore.Slot()
+    def _export(self):
+        try:
+            fp = timings.export()
+        except OSError as e:
+            self.statusMessage.emit((f"Could not export timings: {e}", 10000))
+        else:
+            self.statusMessage.emit((f"Timings exported to {fp}", 10000))
+
+    @QtCore.Slot()
+    def refresh(self):
+        """
+        Shows the timings collected so far
+        """
+        histograms = sorted(timings.histograms().items())
+        self.table.setRowCount(len(histograms))
+
+        for row, (name, h) in enumerate(histograms):
+            values = [
+                name,
+                str(h.count),
+                formatSeconds(h.mean()),
+                formatSeconds(h.percentile(0.5)),
+                formatSeconds(h.percentile(0.9)),
+                formatSeconds(h.max),
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QtWidgets.QTableWidgetItem(value))
+
+            bars, toolTip = self._histogramText(h)
+            item = QtWidgets.QTableWidgetItem(bars)
+            item.setToolTip(toolTip)
+            self.table.setItem(row, len(values), item)
+
+        self.table.resizeColumnsToContents()
+
+    def _histogramText(self, h: Histogram):
+        """
+        The buckets of `h` drawn as bars, from its shortest to its longest
+        duration, and a tool tip with the count of each bucket.
+        """
+        used = [b for b, count in enumerate(h.buckets) if count]
+        if not used:
+            return "", ""
+
+        buckets = range(used[0], used[-1] + 1)
+        most = max(h.buckets)
+        steps = len(self._bars) - 1
+        bars = "".join(
+            self._bars[math.ceil(h.buckets[b] * steps / most)] for b in buckets
+        )
+        toolTip = "\n".join(
+            f"< {formatSeconds(Histogram.bucketLimit(b))}: {h.buckets[b]}"
+            for b in buckets
+        )
+        return bars, toolTip
@@ -7,7 +7,7 @@ from PIL import Image
 
 from PySide2 import QtCore
 
-from base import config, QWorker
+from base import config, timings, QWorker
 
 from .transect import Transect
 
@@ -201,6 +201,7 @@ class TransectTableModel(QtCore.QAbstractTableModel):
         self._threadpool.start(self._copyWorker)
 
 
+@timings.timed("Import: copy files")
 def copyTransectFiles(transects, toFolder, progress=None):
     """
     Copies all transect files to another folder
@@ -249,6 +250,7 @@ def copyTransectFiles(transects, toFolder, progress=None):
                 f.write(f"{fromPath.name}\t-->\t{toPath.name}\n")
 
 
+@timings.timed("Import: categorize")
 def categorizeFlightImages(searchFolder, maxDelay, minCount, progress=None):
     """
     Categorizes the images in the searchFolder into transects
@@ -6,3 +6,5 @@ class UserRoles:
     EntireImage = QtCore.Qt.UserRole + 1  # Entire image (not cropped into sections)
     ImagePath = QtCore.Qt.UserRole + 2  # Path to the original image
     DrawnItems = QtCore.Qt.UserRole + 3  # Items drawn on this image
+    FullResSize = QtCore.Qt.UserRole + 4  # Size of the full resolution image
+    FullResTile = QtCore.Qt.UserRole + 5  # View of the full res. image (no copy)
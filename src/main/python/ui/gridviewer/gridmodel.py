@@ -1,43 +1,107 @@
+import time
+from functools import partial
 from pathlib import Path
 
 from PySide2 import QtCore, QtGui
 
 from drawingdata import DrawingDataList
+from imagecache import ThumbnailCache, pixelBudget
 from transectdata import TransectData
-from base import QWorker, config
-from tools import saveManyImages, roundToMultiple
+from base import CancelToken, QWorker, config, timings
+from tools import ImageSaver, roundToMultiple
 
 from .merging import MergedIndexes
 from .enums import UserRoles
 from .imagedata import FullImage
+from .loading import ImageLoader
+from .prefetching import FolderPrefetcher
+from .rescaling import ImageRescaler
 
 
 class QImageGridModel(QtCore.QAbstractTableModel):
 
-    loadProgress = QtCore.Signal(int)
+    # Number of images added to the grid at once while loading
+    _insertBatchSize = 16
+
     loadFinished = QtCore.Signal()
     message = QtCore.Signal(tuple)
+    autosaveFailed = QtCore.Signal()
     transectDataChanged = QtCore.Signal(TransectData)
 
     def __init__(self):
         super().__init__()
 
-        self._imageRows = 2
-        self._imageCols = 2
+        self._imageRows = config.gridRows
+        self._imageCols = config.gridColumns
         self._minimumImageWidth = 20
         self._singleImageWidth: int = None
         self._lastSingleImageWidth: int = None
         self._displayWidth: int = None
+
+        # Scales images to a new width in the background
+        self._rescaler: ImageRescaler = None
+        self._rescaleGeneration = 0
+
         self.setDisplayWidth(200)
 
         self._images: FullImage = []
 
-        self._loadWorker = None
+        # Positions of the images in `_images`, by their path
+        self._positionsByPath = {}
+
+        self._loader = None
+        self._loadGeneration = 0
+
+        # Cancelled loaders and rescalers, kept alive until the
+        # workers that they hold the only references to are done
+        self._cancelledJobs = set()
+        self._loadStarted = 0
+        self._prefetcher = FolderPrefetcher()
+        self._thumbnailCache: ThumbnailCache = None
+        self._visibleImages = (0, 0)
+        self._placeholders = {}
         self._threadpool = QtCore.QThreadPool()
 
-        # Keep track of which indexes changed
-        # so we know what to save
-        self._changedIndexes = []
+        # Marked images are rendered and written on `_threadpool`
+        self._imageSaver = ImageSaver(self._threadpool, 0)
+        self._imageSaver.progress.connect(self._showSaveProgress)
+        self._imageSaver.finished.connect(self._imagesSaved)
+
+        # Marked images are composited for export on it as well
+        self._imageExporter = ImageSaver(self._threadpool, 0)
+        self._imageExporter.progress.connect(self._showExportProgress)
+        self._imageExporter.finished.connect(self._imagesExported)
+
+        # Images are added to the grid in batches, one batch per
+        # event loop iteration, so the grid can be used in between.
+        self._filesToAdd = []
+        self._savedDrawings = {}
+        self._insertTimer = QtCore.QTimer(self)
+        self._insertTimer.setSingleShot(True)
+        self._insertTimer.setInterval(0)
+        self._insertTimer.timeout.connect(self._addNextBatch)
+
+        # The save data of the loaded folder. Kept around
+        # so saving only has to write what changed.
+        self._saveData = None
+
+        # Autosaves write the save data on a thread of their own, one
+        # at a time and in order: {snapshot being saved: worker}
+        self._autosaveThreadpool = QtCore.QThreadPool()
+        self._autosaveThreadpool.setMaxThreadCount(1)
+        self._autosaves = {}
+
+        # Marked images still to write, which autosaves leave
+        # for later: {marked path: (image, drawings) or None to remove}
+        self._markedImages = {}
+
+        # Images are decoded on their own pool, so that the number
+        # of decoding threads can be capped separately.
+        self._loadThreadpool = QtCore.QThreadPool()
+
+        # Keep track of which images changed so we know what to save:
+        # {image path: {(row, column) of each changed part}}
+        self._dirtyImages = {}
 
     def displayWidth(self):
         return self._displayWidth
@@ -51,12 +115,7 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         Internally, this updates the _singleImageWidth variable.
         """
         self._displayWidth = width
-
-        # Compute single image width
-        numCols = self.columnCount()
-        margin = config.gridImageMargin
-        preciseImageWidth = self._displayWidth / numCols - (margin * (numCols + 1))
-        imageWidth = roundToMultiple(preciseImageWidth, config.gridImageUpdateWidth)
+        imageWidth = self._computeSingleImageWidth()
 
         # Only set this value if it is the same as the last once computed.
         # This fixes a bug that caused flip flopping image sizes and freezing
@@ -72,15 +131,91 @@ class QImageGridModel(QtCore.QAbstractTableModel):
 
         self._lastSingleImageWidth = imageWidth
 
+        # Scaling to any other width is no longer needed
+        if (
+            self._rescaler is not None
+            and self._rescaler.width != self._singleImageWidth
+        ):
+            self._cancelRescale()
+
+    def _computeSingleImageWidth(self):
+        """
+        The width of a single image part,
+        for the current display width and number of columns.
+        """
+        numCols = self.columnCount()
+        margin = config.gridImageMargin
+        preciseImageWidth = self._displayWidth / numCols - (margin * (numCols + 1))
+        return roundToMultiple(preciseImageWidth, config.gridImageUpdateWidth)
+
+    def setTiling(self, rows, cols):
+        """
+        Divides every image into `rows` by `cols` parts.
+
+        Loaded images are divided again from the pixels in memory,
+        without decoding them again. Drawings keep their position
+        on the image: they are assigned to the new parts the same way
+        that drawings on a merged preview are.
+        """
+        if (rows, cols) == (self._imageRows, self._imageCols):
+            return
+
+        # Collect the drawings of each image in image coordinates,
+        # while the indexes still follow the old tiling.
+        drawingsByImage = {}
+        for i, image in enumerate(self._images):
+            if image.hasDrawings():
+                mergedIndexes = MergedIndexes(self._imageIndexes(i))
+                mergedIndexes.positions.resultantTopLefts(UserRoles.FullResSize)
+                drawingsByImage[i] = mergedIndexes.drawnItems()
+
+        # Nothing that was scaled for the old parts is of use anymore
+        self._cancelRescale()
+
+        self.beginResetModel()
+        self._imageRows = rows
+        self._imageCols = cols
+        for image in self._images:
+            image.retile(rows, cols)
+
+        # Take the part width for the new number of columns right away
+        imageWidth = self._computeSingleImageWidth()
+        self._singleImageWidth = max(imageWidth, self._minimumImageWidth)
+        self._lastSingleImageWidth = imageWidth
+        self.endResetModel()
+
+        # Moving drawings to other parts does not change them, so only
+        # images that had unsaved changes before still have them.
+        dirtyImages = set(self._dirtyImages)
+        for i, drawings in drawingsByImage.items():
+            MergedIndexes(self._imageIndexes(i)).setModelDrawings(self, drawings)
+
+        allParts = {(r, c) for r in range(rows) for c in range(cols)}
+        self._dirtyImages = {path: set(allParts) for path in dirtyImages}
+
     def tryAddFolder(self, path):
 
+        imgFiles = self.imageFiles(path)
+
+        if len(imgFiles) == 0:
+            return
+        else:
+            self.resetImagesFromFiles(imgFiles)
+
+    @staticmethod
+    def imageFiles(path):
+        """
+        The image files in the folder at `path`.
+        Empty if `path` is not a folder.
+        """
+
         searchFolder = Path(path)
 
         # list of relevant files
         imgFiles = []
 
         if not searchFolder.is_dir():
-            return
+            return imgFiles
 
         for filename in searchFolder.glob("*"):
 
@@ -94,36 +229,268 @@ class QImageGridModel(QtCore.QAbstractTableModel):
 
             imgFiles.append(fp)
 
-        if len(imgFiles) == 0:
-            return
-        else:
-            self.resetImagesFromFiles(imgFiles)
+        return imgFiles
 
     def resetImagesFromFiles(self, imgList):
+        """
+        Clears the grid and adds the images in `imgList` to it in batches,
+        as placeholders. Their pixels are decoded in the background,
+        visible images first, and saved drawings are applied to each
+        batch as it is added. The grid can be used the whole time.
+        """
 
-        # Initialize runner with arguments for FullImage static constructor
-        args = [imgList, self._imageRows, self._imageCols, [self._singleImageWidth]]
-        self._loadWorker = QWorker(FullImage.CreateFromFiles, args)
-        self._loadWorker.includeProgress()
-        self._loadWorker.signals.progress.connect(
-            self.loadProgress.emit
-        )  # bubble up progress
-        self._loadWorker.signals.result.connect(self.resetImagesFromFullImages)
-        self._loadWorker.signals.finished.connect(self.loadFinished.emit)
-        self._threadpool.start(self._loadWorker)
-
-    def _resetLoadWorker(self):
-        """
-        The `_loadWorker` variable tracks the QWorker that is currently
-        processing. Call this method when the QWorker finishes it's task
+        # The user may have changed the thread limit since the last load
+        self._loadThreadpool.setMaxThreadCount(config.loadWorkerCount())
+
+        self.resetImagesFromFullImages([])
+
+        # Thumbnails are cached on disk, alongside the images
+        folder = Path(imgList[0]).parent
+        self._thumbnailCache = self._prefetcher.cache(folder) or ThumbnailCache(folder)
+        self._saveData = self._loadSaveData(folder)
+        self._savedDrawings = dict(self._saveData.drawings())
+
+        self._loadStarted = time.perf_counter()
+
+        # Each load gets a new generation, so results of
+        # earlier loads can never be mistaken for this one.
+        self._loadGeneration += 1
+        token = CancelToken(self._loadGeneration)
+
+        # Initialize loader with arguments for FullImage static constructor.
+        # Its slots are given the loader, to tell whether it is current.
+        loader = ImageLoader(
+            self._loadThreadpool, token, [self._singleImageWidth], self._thumbnailCache,
+        )
+        loader.prioritize(*self._visibleImages)
+        loader.progress.connect(partial(self._showLoadProgress, loader))
+        loader.imageLoaded.connect(partial(self._imageLoaded, loader))
+        loader.finished.connect(self._thumbnailCache.prune)
+        loader.finished.connect(self._thumbnailCache.flush)
+        loader.finished.connect(partial(self._prefetchNextFolder, loader))
+        loader.finished.connect(partial(self._recordLoadTime, loader))
+        loader.finished.connect(partial(self._resetLoader, loader))
+        self._loader = loader
+
+        self._filesToAdd = list(imgList)
+        self._addNextBatch()
+
+        # The grid can be used while the rest loads in the background
+        self.loadFinished.emit()
+
+    @QtCore.Slot()
+    def _addNextBatch(self):
+        """
+        Adds the next batch of `_filesToAdd` to the grid as placeholders,
+        and queues them for loading. Placeholders only know the size of
+        their image, which is enough to lay out the grid.
+        Schedules the next batch, so the GUI stays responsive in between.
+        """
+        batch = self._filesToAdd[: self._insertBatchSize]
+        del self._filesToAdd[: self._insertBatchSize]
+
+        images = [
+            FullImage.CreatePlaceholder(
+                fp, self._imageRows, self._imageCols, self._thumbnailCache, pixelBudget,
+            )
+            for fp in batch
+        ]
+
+        first = len(self._images)
+        if images:
+            self.beginInsertRows(
+                QtCore.QModelIndex(),
+                first * self._imageRows,
+                (first + len(images)) * self._imageRows - 1,
+            )
+            self._images.extend(images)
+            self._indexPaths(first)
+            self.endInsertRows()
+
+        self._applySaveData(range(first, len(self._images)))
+        self._loader.addImages(images)
+
+        if self._filesToAdd:
+            self._insertTimer.start()
+        else:
+            self._warnUnusedSaveData()
+            self._loader.close()
+
+    def _resetLoader(self, loader):
+        """
+        The `_loader` variable tracks the ImageLoader that is currently
+        processing. Call this method when the loader finishes it's task
         to free it up for the next large load process.
         """
-        self._loadWorker = None
+        if self._isCurrentLoad(loader):
+            self._loader = None
+
+    def _recordLoadTime(self, loader):
+        """
+        Records how long it took to load every image of the folder
+        """
+        if self._isCurrentLoad(loader):
+            timings.record("Load folder", time.perf_counter() - self._loadStarted)
+
+    def _prefetchNextFolder(self, loader):
+        """
+        Once the current folder is loaded, prepares the thumbnails of
+        the transect folder after it, if prefetching is turned on.
+        """
+        if not config.prefetchNextTransect or not self._isCurrentLoad(loader):
+            return
+
+        folder = FolderPrefetcher.NextFolder(self._folder())
+        if folder is not None:
+            self._prefetcher.prefetch(folder, self.imageFiles(folder), self._imageCols)
+
+    def _cancelLoad(self):
+        """
+        Stops the current load, if there is one. Its results are
+        discarded, and none of its signals will be handled.
+        Prefetching stops as well, since the user moved on.
+        """
+        self._prefetcher.cancel()
+        self._cancelRescale()
+        self._insertTimer.stop()
+        self._filesToAdd = []
+
+        if self._loader is not None:
+            self._drainJob(self._loader)
+            self._loader = None
+
+            # Keep the thumbnails that were cached so far
+            self._thumbnailCache.flush()
+
+        self._loadGeneration += 1
+
+    def _isCurrentLoad(self, loader):
+        """
+        Whether the `loader` is the current load
+        """
+        return loader is self._loader and loader.generation == self._loadGeneration
+
+    def _showLoadProgress(self, loader, value):
+        if not self._isCurrentLoad(loader):
+            return
+
+        if value < 100:
+            self.message.emit((f"Loading images... {value}%",))
+        else:
+            self.message.emit(("Images loaded", 5000))
+
+    def _imageLoaded(self, loader, i):
+        """
+        Updates the view of the image at position `i`,
+        now that its pixels are loaded.
+        """
+        if not self._isCurrentLoad(loader):
+            return
+
+        self._imageChanged(i, [QtCore.Qt.DecorationRole, QtCore.Qt.SizeHintRole])
+
+    def _imageChanged(self, i, roles):
+        """
+        Notes that the data of the given `roles` changed
+        for all parts of the image at position `i`.
+        """
+        first = self.index(i * self._imageRows, 0)
+        last = self.index((i + 1) * self._imageRows - 1, self._imageCols - 1)
+        self.dataChanged.emit(first, last, roles)
+
+    def _rescaledPart(self, i, r, c):
+        """
+        Queues the image at position `i` to be scaled to the current
+        width in the background. Until that is done, its part at row r
+        and column c is shown at the nearest width in memory, stretched.
+        """
+        image = self._images[i]
+        width = self._singleImageWidth
+
+        if self._rescaler is None:
+            self._rescaleGeneration += 1
+            token = CancelToken(self._rescaleGeneration)
+            self._rescaler = ImageRescaler(self._loadThreadpool, token, width)
+            self._rescaler.imageRescaled.connect(
+                partial(self._imageRescaled, self._rescaler)
+            )
+        self._rescaler.rescale(i, image)
+
+        size = image.partSize(r, c, width)
+        nearest = image.nearestScaledWidth(width)
+        if nearest is None:
+            return self._placeholder(size)
+        return image.drawnPart(r, c, nearest).scaled(size)
+
+    def _imageRescaled(self, rescaler, i):
+        """
+        Updates the view of the image at position `i`,
+        now that `rescaler` scaled it to the current width.
+        """
+        if rescaler is not self._rescaler:
+            return
+        if rescaler.generation != self._rescaleGeneration:
+            return
+
+        self._imageChanged(i, [QtCore.Qt.DecorationRole])
+
+    def _cancelRescale(self):
+        """
+        Stops scaling images in the background, if it is happening
+        """
+        if self._rescaler is not None:
+            self._drainJob(self._rescaler)
+            self._rescaler = None
+        self._rescaleGeneration += 1
+
+    def _drainJob(self, job):
+        """
+        Cancels an `ImageLoader` or `ImageRescaler`,
+        and keeps it until its running workers are done
+        """
+        self._cancelledJobs.add(job)
+        job.drained.connect(partial(self._cancelledJobs.discard, job))
+        job.cancel()
+
+    def setVisibleRows(self, first, last):
+        """
+        Tells the model which rows the view is showing, so the
+        images in those rows are loaded first.
+        """
+        self._visibleImages = (first // self._imageRows, last // self._imageRows)
+        if self._loader is not None:
+            self._loader.prioritize(*self._visibleImages)
+
+    def rebuildThumbnails(self, folder):
+        """
+        Throws away the cached thumbnails of the transect `folder`.
+        They are rebuilt the next time the folder is loaded. If the
+        folder is loaded now and has no unsaved changes, it is reloaded.
+        """
+        ThumbnailCache(folder).clear()
+
+        if len(self._images) == 0 or self._folder() != Path(folder):
+            return
+
+        if not self._dirtyImages:
+            self.tryAddFolder(folder)
 
     def resetImagesFromFullImages(self, fullImages):
+
+        # Anything still loading belonged to the old images
+        self._cancelLoad()
+        self.writeMarkedImages()
+        self.compactSaveData()
+        self._saveData = None
+
+        # Changes that were not saved by now are discarded with the images
+        self._dirtyImages = {}
+
         self.beginResetModel()
-        self._images = []
+        for image in self._images:
+            image.untrack()
         self._images = fullImages
+        self._indexPaths()
         self.endResetModel()
         self._readSaveData()
 
@@ -137,42 +504,128 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         if len(self._images) == 0:
             return
 
+        self._saveData = self._loadSaveData(self._folder())
+        self._savedDrawings = dict(self._saveData.drawings())
+        self._applySaveData(range(len(self._images)))
+        self._warnUnusedSaveData()
+
+    @staticmethod
+    def _loadSaveData(originalFolder):
+        """
+        Loads the save data of the images in `originalFolder`.
+        Empty if there is no save file.
+        """
+
         # Generate the save path
-        originalFolder = self._folder()
         savePath = config.markedDataFile(transectFolder=originalFolder)
 
         # If the path doesn't exist, don't try to load anything
         if not savePath.is_file():
-            return
+            return TransectData({}, fp=savePath)
 
         # Load save data
-        saveData = TransectData.load(savePath)
-        for imageName, drawings in saveData.drawings():
+        return TransectData.load(savePath)
+
+    def compactSaveData(self):
+        """
+        Merges the changes journaled by `save` into the save file,
+        so it can be read without replaying them. Changes that
+        autosaves could not save are saved first.
+        """
+        if self._saveData is None:
+            return
+
+        self._waitForAutosaves()
+
+        # Changes that autosaves could not save would be lost with this data
+        if self._saveData.hasChanges():
+            try:
+                self._saveData.save(self._saveData.fp)
+            except OSError as e:
+                self.message.emit((f"Could not save: {e}",))
+            else:
+                self.transectDataChanged.emit(self._saveData)
+
+        try:
+            TransectData.Compact(self._saveData.fp)
+        except OSError as e:
+            print(f"Could not compact {self._saveData.fp}: {e}")
+
+    def _applySaveData(self, positions):
+        """
+        Sets the saved drawings of the images at `positions`
+        in the image list, if there are any.
+        """
+        for i in positions:
+            image = self._images[i]
+            drawings = self._savedDrawings.pop(image.path.name, None)
+            if drawings is None:
+                continue
 
             # Merge indexes that compose this file, and
             # set the drawings to the merged set.
-            indexes = self.matchPath(originalFolder / imageName)
+            indexes = self._imageIndexes(i)
+            mergedIndexes = MergedIndexes(indexes)
+            mergedIndexes.setModelDrawings(self, drawings)
 
-            if not indexes:
-                print(f"Warning: bad save file -- {imageName} not found.")
-            else:
-                mergedIndexes = MergedIndexes(indexes)
-                mergedIndexes.setModelDrawings(self, drawings)
+            # Since we just read in new data and will have changed
+            # the indexes as a part of that, we should note that
+            # this image actually doesn't have to be saved again.
+            self._dirtyImages.pop(image.path, None)
 
-                # Since we just read in new data and will have changed
-                # the indexes as a part of that, we should note that
-                # these indexes actually don't have to be saved again.
-                self._changedIndexes = []
+    def _warnUnusedSaveData(self):
+        """
+        Warns about saved drawings of images that are not in the grid
+        """
+        for imageName in self._savedDrawings:
+            print(f"Warning: bad save file -- {imageName} not found.")
+        self._savedDrawings = {}
 
     def matchPath(self, path):
-        matches = []
-        for r in range(self.rowCount()):
-            for c in range(self.columnCount()):
-                idx = self.index(r, c)
-                if idx.data(UserRoles.ImagePath) == Path(path):
-                    matches.append(idx)
+        """
+        The indexes of the parts of the image at `path`.
+        Empty if the image is not in the grid.
+        """
+        return self.matchPaths([path])[Path(path)]
+
+    def matchPaths(self, paths):
+        """
+        Looks up the indexes of the parts of each image in `paths`.
+        Returns a dict of {Path: [QModelIndex]}, with an empty list
+        for paths whose image is not in the grid.
+        """
+        matches = {}
+        for path in paths:
+            path = Path(path)
+            matches[path] = [
+                idx
+                for i in self._positionsByPath.get(path, [])
+                for idx in self._imageIndexes(i)
+            ]
         return matches
 
+    def _imageIndexes(self, i):
+        """
+        The indexes of the parts of the image at position `i`
+        """
+        return [
+            self.index(i * self._imageRows + r, c)
+            for r in range(self._imageRows)
+            for c in range(self._imageCols)
+        ]
+
+    def _indexPaths(self, first=0):
+        """
+        Adds the images from position `first` onwards
+        to the lookup of image positions by path.
+        Rebuilds the whole lookup when `first` is 0.
+        """
+        if first == 0:
+            self._positionsByPath = {}
+
+        for i in range(first, len(self._images)):
+            self._positionsByPath.setdefault(self._images[i].path, []).append(i)
+
     def _folder(self, r=0, c=0):
         """
         Retreives the folder of the image at index (r,c).
@@ -181,7 +634,7 @@ class QImageGridModel(QtCore.QAbstractTableModel):
 
     def transectData(self):
         """ Computes the transect save data and returns it. **Unused** """
-        if len(self._changedIndexes) == 0:
+        if not self._dirtyImages:
             return
 
         # If the save file doesn't exist, initialize empty.
@@ -191,30 +644,15 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         else:
             saveData = TransectData({}, fp=transectPath)
 
-        # Only save files that have changed
-        for index in self._changedIndexes:
+        # Look up the parts of all changed images at once
+        indexesByPath = self.matchPaths(self._dirtyImages)
 
-            # If this index is None, i.e., was already taken care of
-            # by a previous index (part of same overall image), continue
-            # to next index.
-            if index is None:
-                continue
+        # Only save files that have changed, each of them once
+        for originalPath, indexes in indexesByPath.items():
 
-            # Retreive the path of the original image, and find
-            # the indexes of the images that also correspond
-            # to that path.
-            originalPath: Path = self.data(index, role=UserRoles.ImagePath)
-            indexes = self.matchPath(originalPath)
-
-            # Now that we have all the indexes associated with this
-            # path, we no longer need them in "changedIndexes"
-            for idx in indexes:
-                try:
-                    num = self._changedIndexes.index(idx)
-                except ValueError:
-                    pass
-                else:
-                    self._changedIndexes[num] = None
+            # The image may have been removed from the grid since
+            if not indexes:
+                continue
 
             # Merge the indexes togther, create a preview image
             mergedIndexes = MergedIndexes(indexes)
@@ -235,6 +673,7 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         return saveData
 
     @QtCore.Slot()
+    @timings.timed("Save transect")
     def save(self):
         """
         Save changes made to the images. This involves:
@@ -242,62 +681,115 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         * Saving the marked up image to a file
         """
 
-        if len(self._changedIndexes) == 0:
+        # Changes that autosaves could not save are saved now
+        self._waitForAutosaves()
+        unsaved = self._saveData is not None and self._saveData.hasChanges()
+        if not (self._dirtyImages or unsaved or self._markedImages):
             return
 
+        if self._dirtyImages:
+            self._updateSaveData()
+
+        # Save & emit the transect data
+        self._saveData.save(self._saveData.fp)
+        self.transectDataChanged.emit(self._saveData)
+
+        # The marked images are written in the background
+        self.writeMarkedImages()
+        if not self._imageSaver.isSaving():
+            self.message.emit(("Save complete", 5000))
+
+    @QtCore.Slot()
+    def autosave(self):
+        """
+        Saves the drawing data of the changed images on a background
+        thread. Their marked images are left for `writeMarkedImages`.
+        """
+        if not self._dirtyImages:
+            return
+
+        self._updateSaveData()
+
+        # Changes made from now on are not part of this autosave
+        snapshot = self._saveData.snapshot()
+        worker = QWorker(snapshot.save, [snapshot.fp])
+        worker.signals.success.connect(partial(self._autosaveSucceeded, snapshot))
+        worker.signals.error.connect(partial(self._autosaveErrored, snapshot))
+        worker.signals.finished.connect(partial(self._autosaves.pop, snapshot))
+        self._autosaves[snapshot] = worker
+        self._autosaveThreadpool.start(worker)
+
+    def _autosaveSucceeded(self, snapshot):
+        self.transectDataChanged.emit(snapshot)
+
+    def _autosaveErrored(self, snapshot, error):
+        _, value, _ = error
+        self.message.emit((f"Could not autosave: {value}",))
+
+        # Unless they were saved some other way already
+        if not snapshot.hasChanges() or self._saveData is None:
+            return
+
+        if self._saveData.fp == snapshot.fp:
+            self._saveData.restoreChanges(snapshot)
+            self.autosaveFailed.emit()
+
+    def _waitForAutosaves(self):
+        """
+        Blocks until the autosaves that were started have finished,
+        and takes back the changes that they could not save.
+        `autosaveFailed` is emitted if there were any.
+        """
+        if not self._autosaves:
+            return
+
+        self._autosaveThreadpool.waitForDone()
+        if self._saveData is None:
+            return
+
+        # Their `_autosaveErrored` slots only run after this, and
+        # would find the changes taken back already
+        failed = False
+        for snapshot in self._autosaves:
+            if snapshot.fp == self._saveData.fp and snapshot.hasChanges():
+                self._saveData.restoreChanges(snapshot)
+                failed = True
+
+        if failed:
+            self.autosaveFailed.emit()
+
+    def _updateSaveData(self):
+        """
+        Puts the drawings of the changed images into the save data.
+        Their marked images are queued up for `writeMarkedImages`.
+        """
+
         # Setup save directory files and folders
         markedFolder = config.markedFolder(transectFolder=self._folder())
         markedFolder.mkdir(exist_ok=True)
 
-        transectPath = config.markedDataFile(transectFolder=self._folder())
-        transectPath.parent.mkdir(exist_ok=True)
+        # Only the changes made to the save data are written
+        if self._saveData is None:
+            self._saveData = self._loadSaveData(self._folder())
+        saveData = self._saveData
 
-        if transectPath.exists():
-            # Initialize save data from old data path
-            saveData = TransectData.load(transectPath)
-        else:
-            transectPath.touch()
-            saveData = TransectData({}, fp=transectPath)
+        # Look up the parts of all changed images at once
+        indexesByPath = self.matchPaths(self._dirtyImages)
 
-        # List of images to be saved and the `save` arguments
-        # [(image, ['C:/Photos/myFavoriteImage.jpg']), ]
-        markedImages = []
+        # Only save files that have changed, each of them once
+        for originalPath, indexes in indexesByPath.items():
 
-        # Only save files that have changed
-        for index in self._changedIndexes:
-
-            # If this index is None, i.e., was already taken care of
-            # by a previous index (part of same overall image), continue
-            # to next index.
-            if index is None:
+            # The image may have been removed from the grid since
+            if not indexes:
                 continue
 
-            # Retreive the path of the original image, and find
-            # the indexes of the images that also correspond
-            # to that path.
-            originalPath: Path = self.data(index, role=UserRoles.ImagePath)
-            indexes = self.matchPath(originalPath)
-
-            # Now that we have all the indexes associated with this
-            # path, we no longer need them in "changedIndexes".
-            # Setting them to None will cause them to be skipped higher
-            # in the loop
-            for idx in indexes:
-                try:
-                    num = self._changedIndexes.index(idx)
-                except ValueError:
-                    pass
-                else:
-                    self._changedIndexes[num] = None
-
-            # Merge the indexes togther, create a preview image
-            mergedIndexes = MergedIndexes(indexes)
-            preview = mergedIndexes.resultantImage()
-
             # Form the new path (./.marked/Alpha_001.JPG)
             markedPath = markedFolder / originalPath.name
 
-            # Merge drawn items and draw them onto the image
+            # Merge the drawn items of the parts of the image. Their
+            # offsets are those of the parts in the full resolution image.
+            mergedIndexes = MergedIndexes(indexes)
+            mergedIndexes.positions.resultantTopLefts(UserRoles.FullResSize)
             drawings: DrawingDataList = mergedIndexes.drawnItems()
             if not drawings.isEmpty():
 
@@ -305,49 +797,160 @@ class QImageGridModel(QtCore.QAbstractTableModel):
                 # already saved.
                 if not saveData.imageHasDrawings(originalPath.name, drawings):
 
-                    # Add this image to the list of images
-                    # to save and add the drawn item string to the save data
-                    drawings.paintToDevice(preview)
-                    markedImages.append((preview, [str(markedPath)]))
+                    # Queue the marked image to be written
+                    # and add the drawn item string to the save data
+                    image = self._images[indexes[0].row() // self._imageRows]
+                    self._markedImages[markedPath] = (image, drawings)
                     saveData.addDrawings(originalPath.name, drawings)
 
             # If there are no drawings, we should delete the image
-            # from the marked folder. (If applicable.)
+            # from the marked folder. (If applicable.) Also ensure that
+            # there are no drawings saved alongside this image (in
+            # particular, if the drawings already existed, we need to
+            # delete them)
             else:
-                try:
-                    markedPath.unlink()
-                except FileNotFoundError:
-                    pass
-                finally:
-                    # Ensure that there are no drawings saved alongside
-                    # this image (in particular, if the drawings already
-                    # existed, we need to delete them)
-                    saveData.removeDrawings(originalPath.name)
+                self._markedImages[markedPath] = None
+                saveData.removeDrawings(originalPath.name)
 
-        # Save & emit the transect data
-        saveData.dump(transectPath)
-        self.transectDataChanged.emit(saveData)
+        # Clear the changed images
+        self._dirtyImages = {}
+
+    @QtCore.Slot()
+    def writeMarkedImages(self):
+        """
+        Writes the marked images of the drawings saved so far in the
+        background, and removes those of images without drawings.
+
+        When `config.markedOverlays` is set, an SVG overlay of the
+        drawings is written next to where the marked image would be
+        (Alpha_001.JPG.svg), instead of the marked image itself.
+        """
+        markedImages = self._markedImages
+        self._markedImages = {}
+        overlays = config.markedOverlays
+
+        for markedPath, marked in markedImages.items():
+            overlayPath = markedPath.with_name(markedPath.name + ".svg")
+
+            # Each image keeps one kind of marked image only
+            if marked is None or overlays:
+                self._removeMarkedImage(markedPath)
+            if marked is None or not overlays:
+                self._removeMarkedImage(overlayPath)
+
+            if marked is None:
+                continue
+
+            image, drawings = marked
+            if overlays:
+                render = partial(
+                    FullImage.MarkedOverlay, image.path, drawings, image.size
+                )
+                self._imageSaver.save(overlayPath, render, 0)
+            else:
+                self._saveMarkedImage(image, drawings, markedPath)
 
-        # Clear the changed index list
-        self._changedIndexes = []
+    def _removeMarkedImage(self, markedPath):
+        self._imageSaver.discard(markedPath)
+        try:
+            markedPath.unlink()
+        except FileNotFoundError:
+            pass
 
-        # On another thread, do the heavily-lifing of
-        # saving the images.
-        if len(markedImages) != 1:
-            msg = f"Saving {len(markedImages)} images..."
+    def finishSaving(self):
+        """
+        Blocks until everything that was saved is written to disk,
+        including marked images that were left for later,
+        and compacts the save data.
+        """
+        self.writeMarkedImages()
+        self._imageSaver.waitForDone()
+        self.compactSaveData()
+
+    def _saveMarkedImage(self, image: FullImage, drawings, markedPath):
+        """
+        Queues the full resolution `image` with `drawings` painted on
+        to be written to `markedPath`. It is rendered on the thread that
+        writes it. Saving uses at most a quarter of the image memory.
+        """
+        # Pixels that are in memory already are not decoded again
+        source = image.image if image.isFullResolution() else None
+        render = partial(FullImage.MarkedImage, image.path, drawings, source)
+
+        size = image.size
+        self._imageSaver.maxBytes = config.pixelMemoryBudget * 1024 * 1024 // 4
+        self._imageSaver.save(markedPath, render, size.width() * size.height() * 4)
+
+    def exportMarkedImages(self, transectFolder, destination):
+        """
+        Writes the images of `transectFolder` that have drawings saved,
+        with the drawings painted on, to the folder `destination`.
+        The images are composited in the background.
+        """
+        transectFolder = Path(transectFolder)
+        savePath = config.markedDataFile(transectFolder=transectFolder)
+
+        # The marked images would replace the images they are made from
+        if Path(destination).resolve() == transectFolder.resolve():
+            self.message.emit(
+                ("Marked images cannot be exported to the folder of the images",)
+            )
+            return
+
+        # The loaded folder may have saves that are still being written
+        if self._saveData is not None and self._saveData.fp == savePath:
+            self._waitForAutosaves()
+            saveData = self._saveData
+        elif savePath.is_file():
+            saveData = TransectData.load(savePath)
         else:
-            msg = f"Saving {Path(*markedImages[0][1]).name}..."
-        self.message.emit((msg,))
-        self._saveWorker = QWorker(saveManyImages, [markedImages])
-        self._saveWorker.signals.finished.connect(self._resetSaveWorker)
-        self._saveWorker.signals.finished.connect(self._saveWorkerFinished)
-        self._threadpool.start(self._saveWorker)
+            saveData = TransectData({}, fp=savePath)
 
-    def _saveWorkerFinished(self):
-        self.message.emit(("Save complete", 5000))
+        maxBytes = config.pixelMemoryBudget * 1024 * 1024 // 4
+        self._imageExporter.maxBytes = maxBytes
+        exported = 0
+        for imageName, drawings in saveData.drawings():
+            fp = transectFolder / imageName
+            if drawings.isEmpty() or not fp.is_file():
+                continue
+
+            size = QtGui.QImageReader(str(fp)).size()
+            render = partial(FullImage.MarkedImage, fp, drawings)
+            self._imageExporter.save(
+                Path(destination) / imageName, render, size.width() * size.height() * 4
+            )
+            exported += 1
 
-    def _resetSaveWorker(self):
-        self._saveWorker = None
+        if exported == 0:
+            self.message.emit((f"{transectFolder.name} has no marked images", 5000))
+
+    @QtCore.Slot(int, int, str)
+    def _showExportProgress(self, done, total, path):
+        self.message.emit(
+            (f"Exporting marked images... {done} of {total} ({Path(path).name})",)
+        )
+
+    @QtCore.Slot(int, list)
+    def _imagesExported(self, exported, failures):
+        if not failures:
+            self.message.emit((f"Exported {exported} marked images", 5000))
+            return
+
+        names = ", ".join(Path(path).name for path, _ in failures)
+        self.message.emit((f"Exported {exported} marked images, but not {names}",))
+
+    @QtCore.Slot(int, int, str)
+    def _showSaveProgress(self, done, total, path):
+        self.message.emit((f"Saving images... {done} of {total} ({Path(path).name})",))
+
+    @QtCore.Slot(int, list)
+    def _imagesSaved(self, saved, failures):
+        if not failures:
+            self.message.emit(("Save complete", 5000))
+            return
+
+        names = ", ".join(Path(path).name for path, _ in failures)
+        self.message.emit((f"Save complete, but could not save {names}",))
 
     def setDrawings(self, index, drawings):
         """ Sets the drawn items at this index """
@@ -358,9 +961,8 @@ class QImageGridModel(QtCore.QAbstractTableModel):
 
         image.setDrawings(r, c, drawings)
 
-        # Mark this index as "changed"
-        if not index in self._changedIndexes:
-            self._changedIndexes.append(index)
+        # Mark this part of the image as "changed"
+        self._dirtyImages.setdefault(image.path, set()).add((r, c))
 
         # Note that the data for this index changed
         # so the view can update accordingly
@@ -385,20 +987,34 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         if index.row() < 0:
             return None
 
-        image = self._images[int(index.row() / self._imageRows)]
+        i = int(index.row() / self._imageRows)
+        image = self._images[i]
 
         r = index.row() % self._imageRows
         c = index.column()
 
         if role == QtCore.Qt.DecorationRole:
+            if not image.isLoaded():
+                return self._placeholder(image.partSize(r, c, self._singleImageWidth))
+            if not image.hasScaledParts(self._singleImageWidth):
+                return self._rescaledPart(i, r, c)
             return image.drawnPart(r, c, self._singleImageWidth)
 
         if role == QtCore.Qt.SizeHintRole:
-            return image.part(r, c, self._singleImageWidth).size()
+            # Computed from the image geometry alone, which is known
+            # before any pixels are decoded. Parts are always scaled
+            # to exactly this size.
+            return image.geometry.partSize(r, c, self._singleImageWidth)
+
+        if role == UserRoles.FullResSize:
+            return image.geometry.partRect(r, c).size()
 
         if role == UserRoles.FullResImage:
             return image.part(r, c, None)
 
+        if role == UserRoles.FullResTile:
+            return image.tile(r, c)
+
         if role == UserRoles.EntireImage:
             return image.image
 
@@ -410,6 +1026,20 @@ class QImageGridModel(QtCore.QAbstractTableModel):
 
         return None
 
+    def _placeholder(self, size: QtCore.QSize):
+        """
+        A blank image of the given size, shown until
+        the actual image is loaded.
+        """
+        key = (size.width(), size.height())
+        try:
+            return self._placeholders[key]
+        except KeyError:
+            image = QtGui.QImage(size, QtGui.QImage.Format_RGB32)
+            image.fill(QtGui.QColor(200, 200, 200))
+            self._placeholders[key] = image
+            return image
+
     def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
         """
         No headers are displayed.
@@ -429,6 +1059,7 @@ class QImageGridModel(QtCore.QAbstractTableModel):
             pixmap = QtGui.QPixmap(20, 20)
             pixmap.fill(QtGui.QColor(0, 0, 0))  # black
             self._images.insert(position + row, FullImage(pixmap))
+        self._indexPaths()
 
         self.endInsertRows()
         return True
@@ -437,7 +1068,10 @@ class QImageGridModel(QtCore.QAbstractTableModel):
         """ Remove a row into the model. """
         self.beginRemoveRows(QtCore.QModelIndex(), position, position + rows - 1)
 
+        for image in self._images[position : position + rows]:
+            image.untrack()
         del self._images[position : position + rows]
+        self._indexPaths()
 
         self.endRemoveRows()
         return True
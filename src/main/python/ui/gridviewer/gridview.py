@@ -18,9 +18,9 @@ class QImageGridView(QtWidgets.QTableView):
     )  # Send image/drawings to display
     notificationMessage = QtCore.Signal(str)  # notifications to the main application
     statusMessage = QtCore.Signal(tuple)  # status bar message to the main application
-    loadProgress = QtCore.Signal(int)  # loading progress notification
     loadFinished = QtCore.Signal()  # loading finished notification
     countDataChanged = QtCore.Signal(TransectData)
+    autosaveFailed = QtCore.Signal()  # changes that were autosaved still need saving
 
     def __init__(self):
         super().__init__()
@@ -53,10 +53,17 @@ class QImageGridView(QtWidgets.QTableView):
 
         # Bubble progress and message updates from the model
         # (The model often has to perform expensive loading operations)
-        self.model().loadProgress.connect(self.loadProgress.emit)
         self.model().loadFinished.connect(self.loadFinished.emit)
         self.model().message.connect(self.statusMessage.emit)
         self.model().transectDataChanged.connect(self.countDataChanged.emit)
+        self.model().autosaveFailed.connect(self.autosaveFailed.emit)
+
+        # Images are loaded in the background. Let the model know
+        # which rows are on screen so that those are loaded first.
+        self.verticalScrollBar().valueChanged.connect(self._updateVisibleRows)
+        self.model().modelReset.connect(
+            lambda: QtCore.QTimer.singleShot(0, self._updateVisibleRows)
+        )
 
         # Keep track of when we last sent out a previewed image
         # (generated by the index merger)
@@ -97,6 +104,21 @@ class QImageGridView(QtWidgets.QTableView):
         """
         self.model().tryAddFolder(folder)
 
+    @QtCore.Slot(str)
+    def rebuildThumbnails(self, folder):
+        """
+        Rebuilds the cached thumbnails of the transect `folder`.
+        """
+        self.model().rebuildThumbnails(folder)
+
+    @QtCore.Slot(int, int)
+    def setTiling(self, rows, cols):
+        """
+        Divides each image into `rows` by `cols` parts
+        """
+        self._mergedIndexes = None
+        self.model().setTiling(rows, cols)
+
     @QtCore.Slot(QtCore.QItemSelection, QtCore.QItemSelection)
     def _handleSelectionChange(self, selected, deselected):
         model = self.selectionModel()
@@ -210,15 +232,63 @@ class QImageGridView(QtWidgets.QTableView):
         """
         self.model().save()
 
+    @QtCore.Slot()
+    def autosave(self):
+        """
+        Saves the drawing data of the model in the background.
+        """
+        self.model().autosave()
+
+    @QtCore.Slot()
+    def writeMarkedImages(self):
+        """
+        Writes the marked images that autosaves left for later.
+        """
+        self.model().writeMarkedImages()
+
+    def exportMarkedImages(self, transectFolder, destination):
+        """
+        Exports the marked images of a transect folder to `destination`.
+        """
+        self.model().exportMarkedImages(transectFolder, destination)
+
+    def finishSaving(self):
+        """
+        Waits for the model to write everything that was saved.
+        """
+        self.model().finishSaving()
+
     @QtCore.Slot()
     def computeTransectData(self):
         data = self.model().transectData()
         if data is not None:
             self.model().transectDataChanged.emit(data)
 
+    @QtCore.Slot()
+    def _updateVisibleRows(self):
+        """
+        Sends the range of rows that are in the viewport to the model.
+        """
+        rowCount = self.model().rowCount()
+        if rowCount == 0:
+            return
+
+        first = self.rowAt(0)
+        last = self.rowAt(self.viewport().height() - 1)
+
+        # -1 means that there is no row at that point,
+        # i.e. the rows end before the viewport does
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = rowCount - 1
+
+        self.model().setVisibleRows(first, last)
+
     def resizeEvent(self, event: QtGui.QResizeEvent):
         self.model().setDisplayWidth(event.size().width())
         super().resizeEvent(event)
+        self._updateVisibleRows()
 
 
 if __name__ == "__main__":
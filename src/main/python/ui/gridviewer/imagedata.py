@@ -1,8 +1,14 @@
 from pathlib import Path
+from urllib.parse import quote
 
-from PySide2 import QtCore, QtGui
+from PySide2 import QtCore, QtGui, QtSvg
 
+from base import config, timings
 from drawingdata import DrawingDataList
+from imagecache import pixelCache
+
+from .imagegeometry import ImageGeometry
+from .imagetile import ImageTile
 
 
 class FullImage:
@@ -11,22 +17,267 @@ class FullImage:
     as a full resolution image. Caches the gridded images so
     the computation only happens once.
     Provides convenient access to the images.
+
+    The full resolution image is optional. When a reduced resolution
+    `thumbnail` is given instead, the grid images are scaled from the
+    thumbnail and the full resolution image is only read from `path`
+    the first time it is requested.
+
+    Grid images are scaled through a pyramid of `levels`: level 0 is
+    the parts of the thumbnail, and each next level halves the one
+    before it. A grid width is served by resampling the smallest level
+    that is at least as wide, so no scale ever starts from the full
+    resolution image, and only the parts of the current grid width
+    are kept besides the pyramid.
+
+    With neither, the instance is a placeholder that only knows its
+    size. Its pixels can be provided later with `takePixels`.
     """
 
-    def __init__(self, image, path=Path(), rows=2, cols=2, initialWidths=[200]):
-        self.image = image
+    def __init__(
+        self,
+        image,
+        path=Path(),
+        rows=2,
+        cols=2,
+        initialWidths=[200],
+        thumbnail=None,
+        size=None,
+        cache=None,
+        budget=None,
+    ):
+        """
+        `image`: full resolution image, or `None` if a `thumbnail` is given
+        `thumbnail`: reduced resolution version of the image at `path`
+        `size`: size of the full resolution image. Required without an image.
+        `cache`: `ThumbnailCache` to reload the thumbnail from
+        `budget`: `PixelBudget` that decoded pixel data is tracked by.
+        Data that the budget evicts is reloaded when it is needed again.
+        """
+        # A "thumbnail" that is as large as the image is the image
+        if image is None and thumbnail is not None and thumbnail.size() == size:
+            image = thumbnail
+
+        self._image = image
+        self._thumbnail = thumbnail
+        self._loaded = image is not None or thumbnail is not None
+        self._cache = cache
+        self._budget = budget
         self.path = path
-        self.rows = rows
-        self.cols = cols
+
+        if size is None:
+            size = image.size()
+        self.geometry = ImageGeometry(size, rows, cols)
 
         self.parts = []
+        self.levels = {}
         self.scaledParts = {}
-        self._drawnItems = []
+        self._drawnItems = [[None] * cols for _ in range(rows)]
+
+        # Scaled parts with their drawings painted on, so they are only
+        # painted once: {(row, column): (scaledWidth, QImage)}
+        self._renderedParts = {}
 
-        self.breakUpImage()
         for w in initialWidths:
             self.computeScalings(w)
 
+    @property
+    def size(self):
+        """
+        Size of the full resolution image
+        """
+        return self.geometry.size
+
+    @property
+    def rows(self):
+        return self.geometry.rows
+
+    @property
+    def cols(self):
+        return self.geometry.cols
+
+    @property
+    def image(self):
+        """
+        The full resolution image. Decoded on first access
+        if this instance was created from a thumbnail.
+        """
+        image = self._image
+        if image is None:
+            image = FullImage.ReadImage(self.path)
+            self._image = image
+            self._track("full", [image], self._evictFullResolution)
+        else:
+            self._touch("full")
+        return image
+
+    @property
+    def thumbnail(self):
+        """
+        The reduced resolution image that grid images are scaled from.
+        Reloaded if it was evicted. `None` for placeholders.
+        """
+        thumbnail = self._thumbnail
+        if thumbnail is None and self._loaded:
+            thumbnail = self._readThumbnail()
+            self._thumbnail = thumbnail
+            self._track("thumbnail", [thumbnail], self._evictThumbnail)
+        elif thumbnail is not None:
+            self._touch("thumbnail")
+        return thumbnail
+
+    def _readThumbnail(self):
+        """
+        Reads the thumbnail from the file. Images that were made in memory
+        have no file: theirs is scaled from the full resolution image.
+        """
+        if self._image is not None and not self.path.is_file():
+            return FullImage.ScaledThumbnail(self._image, self.cols)
+
+        thumbnail, _ = FullImage.ReadThumbnail(self.path, self.cols, self._cache)
+        return thumbnail
+
+    def isFullResolution(self):
+        """
+        Whether the full resolution image is in memory
+        """
+        return self._image is not None
+
+    def isLoaded(self):
+        """
+        Whether there are any pixels to draw the grid with.
+        `False` for placeholders.
+        """
+        return self._loaded
+
+    def takePixels(self, other):
+        """
+        Takes over the decoded pixel data of `other`, which must have
+        been loaded from the same file. The drawings are kept as they are.
+        """
+        self._untrackParts()
+        self._image = other._image
+        self._thumbnail = other._thumbnail
+        self._loaded = other._loaded
+        self._renderedParts = {}
+
+        # If this image was retiled while `other` loaded,
+        # the parts of `other` do not fit anymore.
+        if (other.rows, other.cols) != (self.rows, self.cols):
+            self.geometry = ImageGeometry(other.size, self.rows, self.cols)
+            self.parts = []
+            self.levels = {}
+            self.scaledParts = {}
+        else:
+            self.geometry = other.geometry
+            self.parts = other.parts
+            self.levels = other.levels
+            self.scaledParts = other.scaledParts
+
+        if self._thumbnail is not None:
+            self._track("thumbnail", [self._thumbnail], self._evictThumbnail)
+        for level, parts in self.levels.items():
+            self._trackLevel(level, parts)
+        for scaledParts in self.scaledParts.values():
+            self._trackScaledParts(scaledParts)
+
+    def retile(self, rows, cols):
+        """
+        Divides this image into `rows` by `cols` parts. The decoded
+        images are kept, and the new parts are made from them when they
+        are needed. The drawings are cleared, since they belong to the
+        old parts: set them again for the new parts.
+        """
+        self._untrackParts()
+        self.geometry = ImageGeometry(self.size, rows, cols)
+        self.parts = []
+        self.levels = {}
+        self.scaledParts = {}
+        self._renderedParts = {}
+        self._drawnItems = [[None] * cols for _ in range(rows)]
+
+    def untrack(self):
+        """
+        Stops tracking this image's pixel data in the memory budget.
+        Call this when the image is no longer used.
+        """
+        if self._budget is not None:
+            self._budget.remove(self)
+            self._budget = None
+
+    # Memory budget tiers. Full resolution data is evicted first,
+    # the scaled parts that the grid is drawn with last.
+    _tiers = {"full": 0, "thumbnail": 1, "level": 2, "scaled": 2, "rendered": 2}
+
+    def _track(self, kind, images, evict):
+        if self._budget is not None:
+            numBytes = sum(img.sizeInBytes() for img in images)
+            tier = self._tiers[kind.rstrip("0123456789")]
+            self._budget.add(self, kind, numBytes, evict, tier)
+
+    def _untrackParts(self):
+        """
+        Stops tracking the parts in the memory budget, before they are replaced
+        """
+        if self._budget is not None:
+            for kind in ["scaled", "rendered"] + [f"level{l}" for l in self.levels]:
+                self._budget.remove(self, kind)
+
+    def _touch(self, kind):
+        if self._budget is not None:
+            self._budget.touch(self, kind)
+
+    def _trackScaledParts(self, scaledParts):
+        images = [img for row in scaledParts for img in row]
+        self._track("scaled", images, self.scaledParts.clear)
+
+    def _trackLevel(self, level, parts):
+        images = [img for row in parts for img in row]
+        self._track(f"level{level}", images, lambda: self.levels.pop(level, None))
+
+    def _trackRenderedParts(self):
+        images = [img for _, img in self._renderedParts.values()]
+        self._track("rendered", images, self._renderedParts.clear)
+
+    def _evictFullResolution(self):
+        if self._image is not self._thumbnail:
+            self._image = None
+        self.parts = []
+
+    def _evictThumbnail(self):
+        # Small images use the same data as their thumbnail. Images
+        # without a file keep it: it could not be read again.
+        if self._image is self._thumbnail and self.path.is_file():
+            self._image = None
+            self.parts = []
+        self._thumbnail = None
+
+    def partRect(self, r, c, size=None):
+        """
+        The rect of the part at row r and column c, in an image of
+        the given `size`. Defaults to the full resolution size.
+        """
+        return self.geometry.partRect(r, c, size)
+
+    def partSize(self, r, c, scaledWidth):
+        """
+        The size of the part at row r and column c once it is
+        scaled to `scaledWidth`, computed without any pixel data.
+        """
+        return self.geometry.partSize(r, c, scaledWidth)
+
+    def tile(self, r, c) -> ImageTile:
+        """
+        The full resolution part of this image at row r and column c,
+        as a view into the full resolution image. No pixels are copied.
+        """
+        parts = self.parts
+        if not parts:
+            parts = self.breakUpImage()
+        else:
+            self._touch("full")
+        return parts[r][c]
+
     def part(self, r, c, scaledWidth=None):
         """
         Returns a portions of this image.
@@ -34,107 +285,423 @@ class FullImage:
         row r and column c, given that the image is divided
         into the class variable rows and cols.
 
-        If the scaledWidth is None, the full resolution image portion
-        is returned.
+        If the scaledWidth is None, a copy of the full resolution
+        image portion is returned. Use `tile` to avoid the copy.
         """
         if scaledWidth is None:
-            return self.parts[r][c]
+            return self.tile(r, c).toImage()
         else:
             key = str(int(scaledWidth))
             try:
-                return self.scaledParts[key][r][c]
+                scaledParts = self.scaledParts[key]
             except KeyError:
-                self.computeScalings(scaledWidth)
-            finally:
-                return self.scaledParts[key][r][c]
+                scaledParts = self.computeScalings(scaledWidth)
+            else:
+                self._touch("scaled")
+            return scaledParts[r][c]
 
     def drawnPart(self, r, c, scaledWidth):
         """
         Gets the scaled portion of this image,
         with the items drawn on it.
+
+        Parts without drawings are the scaled parts themselves.
+        Parts with drawings are painted once per width, and
+        repainted only when their drawings change.
         """
-        img = self.part(r, c, scaledWidth).copy()
+        items = self.drawings(r, c)
+        if items is None:
+            return self.part(r, c, scaledWidth)
+
+        try:
+            width, img = self._renderedParts[(r, c)]
+        except KeyError:
+            width = None
 
-        # Add drawing items if present
-        items = self.drawnItems(r, c)
-        if items is not None:
+        if width == scaledWidth:
+            self._touch("rendered")
+            return img
 
-            # Since we are drawing on a scaled part of the image,
-            # we need to use the scale factor
-            sf = scaledWidth / self.part(r, c, None).width()
-            items.paintToDevice(img, sf)
+        img = self.part(r, c, scaledWidth).copy()
 
+        # Since we are drawing on a scaled part of the image,
+        # we need to use the scale factor
+        sf = scaledWidth / self.partRect(r, c).width()
+        items.paintToDevice(img, sf)
+
+        self._renderedParts[(r, c)] = (scaledWidth, img)
+        self._trackRenderedParts()
         return img
 
+    def drawings(self, r, c) -> DrawingDataList:
+        """
+        The drawn items at the given row, column, or `None` if
+        there are none. This is the stored list itself, not a copy:
+        it must not be changed. Use `drawnItems` to get a copy.
+        """
+        return self._drawnItems[r][c]
+
+    def hasDrawings(self):
+        """
+        Whether any part of this image has drawings
+        """
+        return any(d is not None for row in self._drawnItems for d in row)
+
     def drawnItems(self, r, c) -> DrawingDataList:
         """
-        Gets the drawn items at the given
-        row, column
+        Gets a copy of the drawn items at the given
+        row, column, that the caller is free to change.
         """
-        return DrawingDataList.loads(self._drawnItems[r][c])
+        drawings = self._drawnItems[r][c]
+        if drawings is None:
+            return DrawingDataList([])
+        return drawings.copy()
 
     def setDrawings(self, r, c, drawings: DrawingDataList):
         """
-        Sets the serialized string of the
-        drawn items at the given row, column to
-        the given value.
+        Sets the drawn items at the given row, column.
+        A copy is stored, so later changes to `drawings`
+        do not affect this image.
         """
-        # It's kind of stupid but the drawn items seems to only be able to
-        # handle the string version of the drawings
-        if drawings is None:
+        if drawings is None or drawings.isEmpty():
             self._drawnItems[r][c] = None
         else:
-            self._drawnItems[r][c] = drawings.dumps()
+            self._drawnItems[r][c] = drawings.copy()
+
+        # The part has to be painted again
+        if self._renderedParts.pop((r, c), None) is not None:
+            self._trackRenderedParts()
 
     def computeScalings(self, width: int):
         """
-        Compute and populate the `scaldWidth` object
+        Compute and populate the `scaldWidth` object.
+        Scales from the pyramid level closest to `width`,
+        building the levels that are missing.
+        Returns the scaled parts.
         """
         width = int(width)
 
-        scaledParts = []
-        self.scaledParts[str(width)] = scaledParts
+        thumbnail = None
+        if self._levelFor(width) not in self.levels:
+            thumbnail = self.thumbnail
 
-        for row in range(self.rows):
-            scaledParts.append([])
+        levels, scaledParts = self.scaleParts(width, thumbnail, self.levels)
+        self.setScaledParts(width, scaledParts, levels)
+        return scaledParts
 
-            for col in range(self.cols):
-                scaledParts[-1].append(self.parts[row][col].scaledToWidth(width))
+    # Smallest part width the pyramid goes down to
+    _minimumLevelWidth = 16
+
+    def levelWidth(self, level):
+        """
+        Width of the parts at pyramid `level`
+        """
+        thumbnailSize = FullImage.ThumbnailSize(self.size, self.cols)
+        if thumbnailSize is None:
+            thumbnailSize = self.size
+        return self.partRect(0, 0, thumbnailSize).width() >> level
+
+    def _levelFor(self, width):
+        """
+        The pyramid level to scale the parts of `width` from:
+        the smallest one that is at least `width` wide.
+        """
+        level = 0
+        while True:
+            nextWidth = self.levelWidth(level + 1)
+            if nextWidth < width or nextWidth < self._minimumLevelWidth:
+                return level
+            level += 1
+
+    def scalingSource(self):
+        """
+        The pixel data in memory that parts are scaled from:
+        a tuple (thumbnail, levels), to pass to `scaleParts`.
+        The thumbnail is `None` if it is not in memory.
+        """
+        return self._thumbnail, dict(self.levels)
+
+    @timings.timed("Scale image")
+    def scaleParts(self, width, thumbnail=None, levels=None):
+        """
+        Scales the parts of this image to `width`, from the closest
+        of the pyramid `levels`. Levels that are missing on the way
+        are built, starting from the `thumbnail`. The thumbnail is read
+        if it is needed but not given.
+
+        Returns a tuple (levels, scaledParts), where `levels` also has
+        the levels that were built. Does not change this instance, so it
+        is safe to call from any thread. Use `setScaledParts` to keep it.
+        """
+        levels = dict(levels or {})
+        target = self._levelFor(width)
+
+        # Start from the closest level that is already built
+        level = target
+        while level > 0 and level not in levels:
+            level -= 1
+
+        if level in levels:
+            parts = levels[level]
+        else:
+            if thumbnail is None:
+                thumbnail = self._readThumbnail()
+            parts = [
+                [
+                    ImageTile(thumbnail, self.partRect(r, c, thumbnail.size()))
+                    for c in range(self.cols)
+                ]
+                for r in range(self.rows)
+            ]
+
+        # Halve the parts until the target level is reached
+        for level in range(level + 1, target + 1):
+            parts = [[self._resample(p, p.width() // 2) for p in row] for row in parts]
+            levels[level] = parts
+
+        scaledParts = [
+            [
+                self._resample(p, width, self.partSize(r, c, width).height())
+                for c, p in enumerate(row)
+            ]
+            for r, row in enumerate(parts)
+        ]
+        return levels, scaledParts
+
+    @staticmethod
+    def _resample(part, width, height=None):
+        """
+        Scales a part (an `ImageTile` or a `QImage`) to `width`,
+        and `height` if given. Otherwise the aspect ratio is kept.
+        """
+        if height is None:
+            height = round(part.height() * width / max(1, part.width()))
+        size = QtCore.QSize(width, height)
 
+        if isinstance(part, ImageTile):
+            return part.scaled(size)
+        return part.scaled(
+            size, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation
+        )
+
+    def setScaledParts(self, width, scaledParts, levels=None):
+        """
+        Keeps the `scaledParts` of `width` and the pyramid `levels`,
+        computed with `scaleParts`. Replaces the parts of any other width.
+        """
+        if levels is not None:
+            for level, parts in levels.items():
+                if level not in self.levels:
+                    self.levels[level] = parts
+                    self._trackLevel(level, parts)
+
+        self.scaledParts = {str(int(width)): scaledParts}
+        self._trackScaledParts(scaledParts)
+
+    def hasScaledParts(self, width):
+        """
+        Whether the parts of `width` are in memory
+        """
+        return str(int(width)) in self.scaledParts
+
+    def nearestScaledWidth(self, width):
+        """
+        The width closest to `width` that there are scaled
+        parts of in memory, or `None` if there are none.
+        """
+        widths = [int(key) for key in self.scaledParts]
+        if not widths:
+            return None
+        return min(widths, key=lambda w: (abs(w - width), -w))
+
+    @timings.timed("Tile image")
     def breakUpImage(self):
         """
         Computes the rects of the image,
         divided into a grid self.rows by self.cols.
-        Uses those rects to generate tables of the
-        parts of this pixmap.
+        Uses those rects to generate tables of
+        tiles that view the parts of the image.
+        Returns the tiles.
         """
 
-        self.parts = []
-        self._drawnItems = []
-
-        w = self.image.width()
-        h = self.image.height()
-
-        segmentWidth = w / self.cols
-        segmentHeight = h / self.rows
+        image = self.image
+        parts = []
 
         for row in range(self.rows):
 
-            self.parts.append([])
-            self._drawnItems.append([])
+            parts.append([])
 
             for col in range(self.cols):
+                rect = self.partRect(row, col)
+                parts[-1].append(ImageTile(image, rect))
+
+        # The tiles share the pixels of the full resolution image,
+        # so they are dropped along with it and take no memory of their own.
+        self.parts = parts
+        return parts
+
+    @staticmethod
+    def ThumbnailSize(size: QtCore.QSize, cols: int):
+        """
+        The size to decode an image of `size` at, such that each of
+        its `cols` parts is at least `config.gridThumbnailWidth` wide.
+        Returns `None` if the image is too small to be reduced.
+        """
+        width = config.gridThumbnailWidth * cols
+        if not size.isValid() or size.width() <= width:
+            return None
+        return QtCore.QSize(width, round(size.height() * width / size.width()))
 
-                x = w - (self.cols - col) * segmentWidth
-                y = h - (self.rows - row) * segmentHeight
+    @staticmethod
+    @timings.timed("Decode image")
+    def ReadImage(fp):
+        """
+        Decodes the full resolution image at `fp`.
+        When `config.pixelCacheEnabled` is set, the decoded pixels are
+        read from the `PixelCache` if they are there, and written to it
+        otherwise, so the image is only decoded once.
+        """
+        if not config.pixelCacheEnabled:
+            return QtGui.QImage(str(fp))
+
+        image = pixelCache.get(fp)
+        if image is None:
+            image = QtGui.QImage(str(fp))
+            pixelCache.put(fp, image)
+
+        return image
+
+    @staticmethod
+    def MarkedImage(fp, drawings: DrawingDataList, image=None):
+        """
+        The full resolution image at `fp` with `drawings` painted on.
+        `image` is that image if it is decoded already, otherwise it is
+        decoded here. Can be called from any thread.
+        """
+        if image is None:
+            image = FullImage.ReadImage(fp)
+
+        # Painting gives the marked image pixels of its own,
+        # the `image` it was made from is left as it was
+        marked = image.convertToFormat(QtGui.QImage.Format_RGB32)
+        drawings.paintToDevice(marked)
+        return marked
+
+    @staticmethod
+    def MarkedOverlay(fp, drawings: DrawingDataList, size: QtCore.QSize) -> bytes:
+        """
+        An SVG image of `drawings` only, for the image of `size` at `fp`.
+        It refers to the image, which is expected in the folder above the
+        overlay, so SVG viewers show the drawings on top of the image.
+        Can be called from any thread.
+        """
+        svg = QtCore.QByteArray()
+        buffer = QtCore.QBuffer(svg)
+        buffer.open(QtCore.QIODevice.WriteOnly)
+
+        generator = QtSvg.QSvgGenerator()
+        generator.setOutputDevice(buffer)
+        generator.setSize(size)
+        generator.setViewBox(QtCore.QRect(QtCore.QPoint(0, 0), size))
+        generator.setTitle(Path(fp).name)
+        drawings.paintToDevice(generator)
+        buffer.close()
+
+        # The generator can only paint, so the image is added
+        # as the first element after the definitions
+        image = (
+            f'<image x="0" y="0" width="{size.width()}" height="{size.height()}" '
+            f'xlink:href="../{quote(Path(fp).name)}"/>\n'
+        )
+        text = svg.data().decode("utf-8")
+        return text.replace("</defs>\n", "</defs>\n" + image, 1).encode("utf-8")
+
+    @staticmethod
+    def ScaledThumbnail(image, cols=2):
+        """
+        The thumbnail of an `image` in memory (a `QImage` or `QPixmap`),
+        of the size that `ReadThumbnail` reads it at
+        """
+        if isinstance(image, QtGui.QPixmap):
+            image = image.toImage()
+
+        thumbnailSize = FullImage.ThumbnailSize(image.size(), cols)
+        if thumbnailSize is None:
+            return image
+        return image.scaled(
+            thumbnailSize, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation
+        )
 
-                rect = QtCore.QRect(x, y, segmentWidth, segmentHeight)
+    @staticmethod
+    def ReadThumbnail(fp, cols=2, cache=None):
+        """
+        Reads the thumbnail of the image file at `fp`, such that each of
+        its `cols` parts is `config.gridThumbnailWidth` wide.
+        Returns a tuple (thumbnail: QImage, size: QSize), where `size`
+        is the size of the full resolution image.
+
+        The JPEG decoder scales while decoding, so this is much faster
+        than decoding the full image and scaling it down.
+        Small images are decoded as they are.
+
+        If a `ThumbnailCache` is given, the thumbnail is read from
+        the cache when possible, and written to it otherwise.
+        """
+        thumbnailWidth = config.gridThumbnailWidth * cols
+        if cache is not None:
+            cached = cache.get(fp, thumbnailWidth)
+            if cached is not None:
+                return cached
 
-                self.parts[-1].append(self.image.copy(rect))
-                self._drawnItems[-1].append(None)
+        reader = QtGui.QImageReader(str(fp))
+        size = reader.size()
+        thumbnailSize = FullImage.ThumbnailSize(size, cols)
+
+        # Small or unreadable images are simply decoded as they are
+        if thumbnailSize is None:
+            return QtGui.QImage(str(fp)), size
+
+        reader.setScaledSize(thumbnailSize)
+        with timings.span("Decode thumbnail"):
+            thumbnail = reader.read()
+        if cache is not None:
+            cache.put(fp, size, thumbnail)
+
+        return thumbnail, size
+
+    @staticmethod
+    def CreateFromFile(fp, rows=2, cols=2, initialWidths=[200], cache=None):
+        """
+        Decodes the image file at `fp` and returns the resulting `FullImage`.
+        Only a reduced resolution thumbnail is decoded, which is enough
+        for the grid. See `ReadThumbnail`.
+        """
+        thumbnail, size = FullImage.ReadThumbnail(fp, cols, cache)
+        return FullImage(None, Path(fp), rows, cols, initialWidths, thumbnail, size)
+
+    @staticmethod
+    def CreatePlaceholder(fp, rows=2, cols=2, cache=None, budget=None):
+        """
+        Creates a `FullImage` for the file at `fp` without decoding it.
+        Only the size of the image is read, from the `ThumbnailCache`
+        if it knows it, otherwise from the file header.
+        """
+        size = None
+        if cache is not None:
+            size = cache.sourceSize(fp)
+        if size is None:
+            size = QtGui.QImageReader(str(fp)).size()
+
+        return FullImage(
+            None, Path(fp), rows, cols, [], size=size, cache=cache, budget=budget
+        )
 
     @staticmethod
     def CreateFromFiles(files, *args, progress=None):
+        """
+        Loads each of the `files`, one after another.
+        For loading many files in parallel, use the `ImageLoader`.
+        """
 
         images = []
         count = len(files)
@@ -142,7 +709,7 @@ class FullImage:
         for i, fp in enumerate(files):
             if progress is not None:
                 progress.emit(int((i / count) * 100))
-            images.append(FullImage(QtGui.QImage(str(fp)), Path(fp), *args))
+            images.append(FullImage.CreateFromFile(fp, *args))
 
         if progress is not None:
             progress.emit(100)
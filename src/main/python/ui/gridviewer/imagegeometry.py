@@ -0,0 +1,62 @@
+from PySide2 import QtCore
+
+
+class ImageGeometry:
+    """
+    The size of an image and how it is divided into parts.
+
+    This is all that is needed to lay out an image in the grid,
+    and it is known before any pixels are decoded: the size comes
+    from the thumbnail cache or from the image file's header.
+    """
+
+    def __init__(self, size: QtCore.QSize, rows=2, cols=2):
+        self.size = QtCore.QSize(size)
+        self.rows = rows
+        self.cols = cols
+
+        # Sizes of the parts at the width they were last asked for:
+        # (width, [[QSize]])
+        self._partSizes = (None, [])
+
+    def partRect(self, r, c, size=None):
+        """
+        The rect of the part at row r and column c, in an image of
+        the given `size`. Defaults to the full resolution size.
+        """
+        if size is None:
+            size = self.size
+
+        w = size.width()
+        h = size.height()
+
+        segmentWidth = w / self.cols
+        segmentHeight = h / self.rows
+
+        x = w - (self.cols - c) * segmentWidth
+        y = h - (self.rows - r) * segmentHeight
+
+        return QtCore.QRect(int(x), int(y), int(segmentWidth), int(segmentHeight))
+
+    def partSize(self, r, c, scaledWidth):
+        """
+        The size of the part at row r and column c
+        once it is scaled to `scaledWidth`.
+        """
+        width, sizes = self._partSizes
+        if width == scaledWidth:
+            return sizes[r][c]
+
+        sizes = []
+        for row in range(self.rows):
+            sizes.append([])
+            for col in range(self.cols):
+                rect = self.partRect(row, col)
+                if rect.width() <= 0:
+                    height = 0
+                else:
+                    height = round(rect.height() * scaledWidth / rect.width())
+                sizes[-1].append(QtCore.QSize(scaledWidth, height))
+
+        self._partSizes = (scaledWidth, sizes)
+        return sizes[r][c]
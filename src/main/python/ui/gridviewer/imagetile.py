@@ -0,0 +1,51 @@
+from PySide2 import QtCore, QtGui
+
+
+class ImageTile:
+    """
+    A rectangular part of a larger image.
+
+    The tile only references the image it is part of, so no pixels
+    are copied when an image is divided into tiles. Pixels are only
+    copied (or scaled) from the shared image when they are requested.
+    """
+
+    def __init__(self, image: QtGui.QImage, rect: QtCore.QRect):
+        self.image = image
+        self.rect = QtCore.QRect(rect)
+
+    def size(self):
+        return self.rect.size()
+
+    def width(self):
+        return self.rect.width()
+
+    def height(self):
+        return self.rect.height()
+
+    def toImage(self):
+        """
+        A copy of the pixels of this tile
+        """
+        return self.image.copy(self.rect)
+
+    def scaled(self, size: QtCore.QSize):
+        """
+        The pixels of this tile, scaled to `size`.
+        Scales straight out of the shared image, without copying the tile.
+        """
+        result = QtGui.QImage(size, QtGui.QImage.Format_RGB32)
+        if result.isNull():
+            return result
+
+        painter = QtGui.QPainter(result)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        painter.drawImage(result.rect(), self.image, self.rect)
+        painter.end()
+        return result
+
+    def paint(self, painter: QtGui.QPainter, x: int, y: int):
+        """
+        Paints this tile with its top left at (x, y)
+        """
+        painter.drawImage(QtCore.QPoint(x, y), self.image, self.rect)
@@ -0,0 +1,210 @@
+from functools import partial
+
+from PySide2 import QtCore
+
+from base import CancelToken, QWorker
+
+from .imagedata import FullImage
+
+
+def _loadImage(token, i, fp, *args):
+    """
+    Decodes and tiles a single file. Returns the generation of the load
+    and the position of the file in the load list along with the result,
+    so results can be put back in the right place.
+    The result is `None` if the load was cancelled before it started.
+    """
+    if token.isCancelled():
+        return token.generation, i, None
+    return token.generation, i, FullImage.CreateFromFile(fp, *args)
+
+
+class ImageLoader(QtCore.QObject):
+    """
+    Decodes and tiles the pixels of placeholder `FullImage`s in parallel.
+
+    Each image is loaded by its own `QWorker` on the given thread pool.
+    Only as many workers as the pool has threads are started at once,
+    the rest wait in the loader. This way the loader never floods the
+    pool (which is shared with other jobs) with hundreds of runnables,
+    and it can choose which image to load next when a worker finishes.
+
+    Images that were marked as visible with `prioritize` are loaded first.
+    After that, the images closest to the visible ones are loaded,
+    so that loading follows the scroll position.
+
+    Images can be added in batches with `addImages` while earlier ones
+    are loading. Call `close` once all images were added: `finished`
+    is only emitted after that.
+
+    A loader that is no longer wanted can be stopped with `cancel`.
+    Images that are being decoded at that point are finished, but their
+    results are thrown away, and no new images are started. A cancelled
+    loader does not emit any signals, except `drained` once its last
+    worker is done. The loader holds the only references to its workers,
+    so it must be kept alive until then.
+    """
+
+    progress = QtCore.Signal(int)  # combined % progress of all images
+    imageLoaded = QtCore.Signal(int)  # position of the image that was loaded
+    finished = QtCore.Signal()
+    drained = QtCore.Signal()  # cancelled, and no workers are running anymore
+
+    def __init__(self, threadpool: QtCore.QThreadPool, token: CancelToken, *args):
+        """
+        `threadpool`: the pool that the decoding workers run on
+        `token`: cancels this load, and tags its results with a generation
+        `args`: passed through to `FullImage.CreateFromFile`,
+        after the file path, rows, and columns.
+        """
+        super().__init__()
+
+        self._token = token
+        self._images = []
+        self._args = args
+        self._threadpool = threadpool
+        self._closed = False
+
+        # Positions of images that are not loaded or loading yet
+        self._pending = set()
+
+        # Positions of the images that are visible, and the position
+        # that loading should move outwards from.
+        self._visible = []
+        self._focus = 0
+
+        # Workers that are currently running, keyed by their signals
+        # object. Holding the reference keeps the worker alive.
+        self._running = {}
+
+        self._numDone = 0
+        self._lastProgress = None
+
+    def addImages(self, images):
+        """
+        Queues placeholder `FullImage`s to be loaded. They are filled in
+        place. Their positions follow those of the images added before.
+        Starts as many workers as the pool has threads free.
+        """
+        if self.isCancelled():
+            return
+
+        first = len(self._images)
+        self._images.extend(images)
+        self._pending.update(range(first, len(self._images)))
+
+        self._emitProgress()
+        while len(self._running) < max(1, self._threadpool.maxThreadCount()):
+            if not self._startNext():
+                break
+
+    def close(self):
+        """
+        Tells the loader that no more images will be added.
+        """
+        if self.isCancelled():
+            return
+
+        self._closed = True
+        self._emitProgress()
+        if self._numDone == len(self._images):
+            self.finished.emit()
+
+    @property
+    def generation(self):
+        return self._token.generation
+
+    def cancel(self):
+        """
+        Stops loading. No more workers are started. Workers that are
+        waiting in the pool return right away when they start, and the
+        results of those that are running are discarded.
+        """
+        self._token.cancel()
+        self._pending.clear()
+        if not self._running:
+            self.drained.emit()
+
+    def isCancelled(self):
+        return self._token.isCancelled()
+
+    def prioritize(self, first, last):
+        """
+        Marks the images from position `first` to `last` (inclusive)
+        as visible. They will be loaded before any others.
+        """
+        self._visible = list(range(first, last + 1))
+        self._focus = (first + last) // 2
+
+    def _nextIndex(self):
+        """
+        Position of the next image to load, or `None` if
+        there is nothing left to load.
+        """
+        for i in self._visible:
+            if i in self._pending:
+                return i
+
+        if len(self._pending) == 0:
+            return None
+
+        return min(self._pending, key=lambda i: (abs(i - self._focus), i))
+
+    def _startNext(self):
+        """
+        Starts a worker for the next image, if there is one.
+        Returns whether a worker was started.
+        """
+        i = self._nextIndex()
+        if i is None:
+            return False
+
+        self._pending.discard(i)
+        image = self._images[i]
+        worker = QWorker(
+            _loadImage,
+            [self._token, i, image.path, image.rows, image.cols, *self._args],
+        )
+        worker.signals.result.connect(self._imageLoaded)
+        worker.signals.finished.connect(partial(self._workerFinished, worker.signals))
+        self._running[worker.signals] = worker
+        self._threadpool.start(worker)
+        return True
+
+    @QtCore.Slot(object)
+    def _imageLoaded(self, result):
+        generation, i, image = result
+
+        # Results of cancelled (or older) loads are never used
+        if image is None or self.isCancelled() or generation != self.generation:
+            return
+
+        self._images[i].takePixels(image)
+        self.imageLoaded.emit(i)
+
+    def _workerFinished(self, signals):
+        self._running.pop(signals, None)
+        if self.isCancelled():
+            if not self._running:
+                self.drained.emit()
+            return
+
+        self._numDone += 1
+        self._emitProgress()
+
+        if self._closed and self._numDone == len(self._images):
+            self.finished.emit()
+        else:
+            self._startNext()
+
+    def _emitProgress(self):
+        """
+        Emits the combined progress of all images, only if it changed.
+        Loading is not complete until all images were added.
+        """
+        value = int((self._numDone / max(1, len(self._images))) * 100)
+        if not self._closed:
+            value = min(value, 99)
+        if value != self._lastProgress:
+            self._lastProgress = value
+            self.progress.emit(value)
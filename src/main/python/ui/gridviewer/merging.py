@@ -1,8 +1,10 @@
 from PySide2 import QtCore, QtGui
 
+from base import timings
 from drawingdata import DrawingDataList
 
 from .enums import UserRoles
+from .imagetile import ImageTile
 
 
 class PositionedIndexes:
@@ -136,7 +138,7 @@ class PositionedIndexes:
         """
         Paints the internal relatively positioned items
         to an image, provided that the given role
-        retreives an image from the index.
+        retreives an image (or an `ImageTile`) from the index.
         """
 
         tops, lefts = self.resultantTopLefts(role)
@@ -158,7 +160,12 @@ class PositionedIndexes:
                     img = idx.data(role)
                     top = tops[y]
                     left = lefts[x]
-                    painter.drawImage(left, top, img)
+
+                    # Tiles are painted straight from the image they view
+                    if isinstance(img, ImageTile):
+                        img.paint(painter, left, top)
+                    else:
+                        painter.drawImage(left, top, img)
 
         painter.end()
 
@@ -171,7 +178,7 @@ class PositionedIndexes:
 
         # Safety check: these must be lists containing at least a [0]
         if not self.tops or self.lefts:
-            self.resultantTopLefts(UserRoles.FullResImage)
+            self.resultantTopLefts(UserRoles.FullResSize)
 
         # If the point is in negative space, we don't
         # have any indexes that would use negative space
@@ -268,12 +275,13 @@ class MergedIndexes:
         # Note: 2D list cells with "None" had no index at that location
         self.positions = PositionedIndexes(indexes)
 
+    @timings.timed("Merge image")
     def resultantImage(self):
         """
         The combined image generated from the set
         of indexes.
         """
-        return self.positions.toImage(UserRoles.FullResImage)
+        return self.positions.toImage(UserRoles.FullResTile)
 
     def setModelDrawings(self, model, items: DrawingDataList):
         """
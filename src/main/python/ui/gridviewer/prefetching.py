@@ -0,0 +1,113 @@
+from functools import partial
+from pathlib import Path
+
+from PySide2 import QtCore
+
+from base import CancelToken, QWorker, config
+from imagecache import ThumbnailCache
+
+from .imagedata import FullImage
+
+
+def _prefetchFolder(token, cache, files, cols):
+    """
+    Writes the grid thumbnails of `files` to the thumbnail `cache`,
+    skipping those that are cached already.
+    Stops between images when the `token` is cancelled.
+    """
+    QtCore.QThread.currentThread().setPriority(QtCore.QThread.IdlePriority)
+
+    thumbnailWidth = config.gridThumbnailWidth * cols
+
+    for fp in files:
+        if token.isCancelled():
+            break
+        if not cache.contains(fp, thumbnailWidth):
+            FullImage.ReadThumbnail(fp, cols, cache)
+
+    cache.flush()
+
+
+class FolderPrefetcher(QtCore.QObject):
+    """
+    Prepares the thumbnails of a transect folder before it is opened,
+    so that opening it only has to read the small cached thumbnails.
+
+    Prefetching runs on a single thread at idle priority, so it only
+    uses CPU time that nothing else wants. Thumbnails go straight to the
+    on-disk cache: no decoded pixels are kept in memory, so prefetching
+    takes nothing away from the memory budget of the open transect.
+
+    A cancelled prefetch finishes its current image in the background.
+    Opening the folder in the meantime is safe: the grid shares the
+    prefetcher's cache of it, see `cache`.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._threadpool = QtCore.QThreadPool()
+        self._threadpool.setMaxThreadCount(1)
+
+        self._token = None
+        self._cache: ThumbnailCache = None
+
+        # Workers that are still running, keyed by their signals object,
+        # cancelled ones included. Holding the reference keeps them alive.
+        self._running = {}
+
+    def prefetch(self, folder, files, cols=2):
+        """
+        Starts prefetching `files` of `folder`, for a grid with `cols`
+        columns. Stops any prefetch that is still running.
+        """
+        self.cancel()
+
+        self._token = CancelToken()
+        self._cache = ThumbnailCache(folder)
+        worker = QWorker(_prefetchFolder, [self._token, self._cache, list(files), cols])
+        worker.signals.finished.connect(partial(self._running.pop, worker.signals))
+        self._running[worker.signals] = worker
+        self._threadpool.start(worker)
+
+    def cancel(self):
+        """
+        Stops prefetching, without waiting for the image that is being
+        prefetched: the worker stops after it, in the background.
+        """
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    def cache(self, folder):
+        """
+        The thumbnail cache that was last prefetched into, if it is
+        the one of `folder`. Otherwise `None`. Use it to load `folder`,
+        so that thumbnails that are still being prefetched are not lost.
+        """
+        if self._cache is not None and self._cache.transectFolder == Path(folder):
+            return self._cache
+        return None
+
+    @staticmethod
+    def NextFolder(folder):
+        """
+        The transect folder that comes after `folder`, sorted by name,
+        or `None` if `folder` is the last one.
+        Hidden folders (such as the `.marked` folders) are skipped.
+        """
+        folder = Path(folder)
+        try:
+            siblings = sorted(
+                fp
+                for fp in folder.parent.iterdir()
+                if fp.is_dir() and not fp.name.startswith(".")
+            )
+        except OSError:
+            return None
+
+        for sibling in siblings:
+            if sibling.name > folder.name:
+                return sibling
+
+        return None
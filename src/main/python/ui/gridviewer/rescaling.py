@@ -0,0 +1,131 @@
+from functools import partial
+
+from PySide2 import QtCore
+
+from base import CancelToken, QWorker
+
+
+def _rescaleImage(token, i, image, source, width):
+    """
+    Scales the parts of `image` to `width`, from the `source` that
+    `FullImage.scalingSource` returned. Returns the generation of the
+    rescale and the position of the image along with the result of
+    `FullImage.scaleParts`. The result is `None` if the rescale
+    was cancelled before it started.
+    """
+    if token.isCancelled():
+        return token.generation, i, None
+
+    return token.generation, i, image.scaleParts(width, *source)
+
+
+class ImageRescaler(QtCore.QObject):
+    """
+    Scales the parts of loaded `FullImage`s to a new grid width
+    in the background, so that resizing the grid does not freeze it.
+
+    Images are queued with `rescale`, typically when the view asks for
+    an image that has no parts of the new width yet. The most recently
+    queued images are scaled first: those are the ones on screen.
+
+    A rescaler only scales to one width. When the width changes again,
+    `cancel` it and start a new one. Its results are thrown away,
+    and it does not emit any signals after that, except `drained` once
+    its last worker is done. The rescaler holds the only references to
+    its workers, so it must be kept alive until then.
+    """
+
+    imageRescaled = QtCore.Signal(int)  # position of the image that was scaled
+    drained = QtCore.Signal()  # cancelled, and no workers are running anymore
+
+    def __init__(self, threadpool: QtCore.QThreadPool, token: CancelToken, width):
+        super().__init__()
+
+        self.width = width
+        self._token = token
+        self._threadpool = threadpool
+
+        # Images waiting to be scaled, by position. Most recent last.
+        self._pending = {}
+
+        # Positions of the images that are being scaled
+        self._queued = set()
+
+        # Workers that are currently running, keyed by their signals
+        # object. Holding the reference keeps the worker alive.
+        self._running = {}
+
+    @property
+    def generation(self):
+        return self._token.generation
+
+    def cancel(self):
+        """
+        Stops rescaling. Results of running workers are discarded.
+        """
+        self._token.cancel()
+        self._pending.clear()
+        if not self._running:
+            self.drained.emit()
+
+    def isCancelled(self):
+        return self._token.isCancelled()
+
+    def rescale(self, i, image):
+        """
+        Queues the image at position `i` to be scaled,
+        unless it already is. It is scaled before any image
+        that was queued earlier.
+        """
+        if self.isCancelled() or i in self._queued:
+            return
+
+        self._pending.pop(i, None)
+        self._pending[i] = image
+        self._startNext()
+
+    def _startNext(self):
+        """
+        Starts a worker for the most recently queued image,
+        if there is a thread free for it.
+        """
+        if not self._pending:
+            return
+        if len(self._running) >= max(1, self._threadpool.maxThreadCount()):
+            return
+
+        i, image = self._pending.popitem()
+        self._queued.add(i)
+
+        # Scale from the pixels in memory when possible. Reading them
+        # here, on the GUI thread, means the worker never has to touch
+        # the image's memory tracking.
+        source = image.scalingSource()
+
+        worker = QWorker(_rescaleImage, [self._token, i, image, source, self.width])
+        worker.signals.result.connect(partial(self._imageRescaled, worker.signals))
+        worker.signals.finished.connect(partial(self._workerFinished, worker.signals))
+        self._running[worker.signals] = (worker, i, image)
+        self._threadpool.start(worker)
+
+    def _imageRescaled(self, signals, result):
+        generation, i, scaled = result
+
+        # Results of cancelled (or older) rescales are never used
+        if scaled is None or self.isCancelled() or generation != self.generation:
+            return
+
+        levels, parts = scaled
+        _, _, image = self._running[signals]
+        image.setScaledParts(self.width, parts, levels)
+        self.imageRescaled.emit(i)
+
+    def _workerFinished(self, signals):
+        _, i, _ = self._running.pop(signals)
+        self._queued.discard(i)
+        if self.isCancelled():
+            if not self._running:
+                self.drained.emit()
+            return
+
+        self._startNext()
@@ -19,6 +19,8 @@ class Library(QtWidgets.QWidget):
     showFlightInfoRequested = QtCore.Signal(str)
     showMigrationLogRequested = QtCore.Signal(str)
     showDistributionFormRequested = QtCore.Signal(str)
+    rebuildThumbnailsRequested = QtCore.Signal(str)
+    exportMarkedImagesRequested = QtCore.Signal(str)
 
     # Events
     Events = EventTypes()
@@ -36,6 +38,7 @@ class Library(QtWidgets.QWidget):
         self.proxyModel.filterOut.append(config.markedImageFolderName.lower())
         self.proxyModel.filterOut.append(config.imageWaoMetaFolderName.lower())
         self.proxyModel.filterOut.append(config.flightDataFolderName.lower())
+        self.proxyModel.filterOut.append(config.thumbnailFolderName.lower())
 
         self.address = AddressBar()
 
@@ -54,6 +57,12 @@ class Library(QtWidgets.QWidget):
         self.menu.showDistributionFormRequested.connect(
             self.showDistributionFormRequested.emit
         )
+        self.menu.rebuildThumbnailsRequested.connect(
+            self.rebuildThumbnailsRequested.emit
+        )
+        self.menu.exportMarkedImagesRequested.connect(
+            self.exportMarkedImagesRequested.emit
+        )
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self._customMenuRequested)
 
@@ -315,6 +324,8 @@ class Library(QtWidgets.QWidget):
 
             if self._inFolderLevel(1):
                 self.menu.enableShowMigrationLog()
+                self.menu.enableRebuildThumbnails()
+                self.menu.enableExportMarkedImages()
 
         # Show the menu
         self.menu.popup(self.mapToGlobal(pos))
@@ -19,6 +19,8 @@ class LibraryMenu(QtWidgets.QMenu):
     showFlightInfoRequested = QtCore.Signal(str)  # flight folder
     showMigrationLogRequested = QtCore.Signal(str)  # transect folder
     showDistributionFormRequested = QtCore.Signal(str)  # flight folder
+    rebuildThumbnailsRequested = QtCore.Signal(str)  # transect folder
+    exportMarkedImagesRequested = QtCore.Signal(str)  # transect folder
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -28,6 +30,8 @@ class LibraryMenu(QtWidgets.QMenu):
         self.showFlightInfoAction = None
         self.showMigrationLogAction = None
         self.showDistributionFormAction = None
+        self.rebuildThumbnailsAction = None
+        self.exportMarkedImagesAction = None
 
         self._targetPath = ""
 
@@ -37,6 +41,8 @@ class LibraryMenu(QtWidgets.QMenu):
         self.showFlightInfoAction = None
         self.showMigrationLogAction = None
         self.showDistributionFormAction = None
+        self.rebuildThumbnailsAction = None
+        self.exportMarkedImagesAction = None
 
     def setTargetPath(self, path: str):
         """
@@ -96,6 +102,30 @@ class LibraryMenu(QtWidgets.QMenu):
             lambda: self.showDistributionFormRequested.emit(self._targetPath)
         )
 
+    def enableRebuildThumbnails(self):
+        """
+        Creates the action to rebuild the thumbnails of a transect.
+        Will be added to the menu during popup()
+        """
+        self.rebuildThumbnailsAction = QtWidgets.QAction(
+            "Rebuild thumbnails", self.parent()
+        )
+        self.rebuildThumbnailsAction.triggered.connect(
+            lambda: self.rebuildThumbnailsRequested.emit(self._targetPath)
+        )
+
+    def enableExportMarkedImages(self):
+        """
+        Creates the action to export the marked images of a transect.
+        Will be added to the menu during popup()
+        """
+        self.exportMarkedImagesAction = QtWidgets.QAction(
+            "Export marked images", self.parent()
+        )
+        self.exportMarkedImagesAction.triggered.connect(
+            lambda: self.exportMarkedImagesRequested.emit(self._targetPath)
+        )
+
     def popup(self, *args):
         """
         Re-implemented to show popup menu.
@@ -121,5 +151,11 @@ class LibraryMenu(QtWidgets.QMenu):
         if self.showMigrationLogAction is not None:
             self.addAction(self.showMigrationLogAction)
 
+        if self.rebuildThumbnailsAction is not None:
+            self.addAction(self.rebuildThumbnailsAction)
+
+        if self.exportMarkedImagesAction is not None:
+            self.addAction(self.exportMarkedImagesAction)
+
         self.reset()
         return super().popup(*args)
@@ -1,3 +0,0 @@
-from .loadingoverlay import LoadingOverlay
-
-__all__ = [LoadingOverlay]
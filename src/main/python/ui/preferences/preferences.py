@@ -20,8 +20,122 @@ class PreferencesDialog(QtWidgets.QDialog):
         self.usernameBox.setPlaceholderText("Enter your name")
         self.usernameBox.setToolTip(usernameToolTip)
 
+        loadWorkersToolTip = (
+            "Number of threads used to load images. "
+            "Lower this to keep the computer responsive while loading."
+        )
+        loadWorkersLabel = QtWidgets.QLabel()
+        loadWorkersLabel.setText("Image loading threads")
+        loadWorkersLabel.setToolTip(loadWorkersToolTip)
+        self.loadWorkersBox = QtWidgets.QSpinBox()
+        self.loadWorkersBox.setRange(0, QtCore.QThread.idealThreadCount())
+        self.loadWorkersBox.setSpecialValueText("Automatic")  # shown for 0
+        self.loadWorkersBox.setValue(config.maxLoadWorkers)
+        self.loadWorkersBox.setToolTip(loadWorkersToolTip)
+
+        memoryToolTip = (
+            "Memory that loaded images may use. "
+            "The least recently viewed images are freed first."
+        )
+        memoryLabel = QtWidgets.QLabel()
+        memoryLabel.setText("Image memory limit")
+        memoryLabel.setToolTip(memoryToolTip)
+        self.memoryBox = QtWidgets.QSpinBox()
+        self.memoryBox.setRange(256, 65536)
+        self.memoryBox.setSingleStep(256)
+        self.memoryBox.setSuffix(" MB")
+        self.memoryBox.setValue(config.pixelMemoryBudget)
+        self.memoryBox.setToolTip(memoryToolTip)
+
+        tilingToolTip = (
+            "Number of rows and columns that each image is divided into "
+            "in the image grid"
+        )
+        tilingLabel = QtWidgets.QLabel()
+        tilingLabel.setText("Image grid tiling")
+        tilingLabel.setToolTip(tilingToolTip)
+        self.gridRowsBox = QtWidgets.QSpinBox()
+        self.gridRowsBox.setRange(1, 6)
+        self.gridRowsBox.setValue(config.gridRows)
+        self.gridRowsBox.setToolTip(tilingToolTip)
+        self.gridColumnsBox = QtWidgets.QSpinBox()
+        self.gridColumnsBox.setRange(1, 6)
+        self.gridColumnsBox.setValue(config.gridColumns)
+        self.gridColumnsBox.setToolTip(tilingToolTip)
+        tilingLayout = QtWidgets.QHBoxLayout()
+        tilingLayout.addWidget(self.gridRowsBox)
+        tilingLayout.addWidget(QtWidgets.QLabel("×"))
+        tilingLayout.addWidget(self.gridColumnsBox)
+
+        prefetchToolTip = (
+            "Prepare the images of the next transect in the background, "
+            "so that it opens faster."
+        )
+        prefetchLabel = QtWidgets.QLabel()
+        prefetchLabel.setText("Prefetch next transect")
+        prefetchLabel.setToolTip(prefetchToolTip)
+        self.prefetchBox = QtWidgets.QCheckBox()
+        self.prefetchBox.setChecked(config.prefetchNextTransect)
+        self.prefetchBox.setToolTip(prefetchToolTip)
+
+        pixelCacheToolTip = (
+            "Keep the pixels of recently opened images on disk, "
+            "so that they open faster the next time. Needs a lot of disk space."
+        )
+        pixelCacheLabel = QtWidgets.QLabel()
+        pixelCacheLabel.setText("Decoded image cache")
+        pixelCacheLabel.setToolTip(pixelCacheToolTip)
+        self.pixelCacheBox = QtWidgets.QCheckBox()
+        self.pixelCacheBox.setChecked(config.pixelCacheEnabled)
+        self.pixelCacheBox.setToolTip(pixelCacheToolTip)
+        self.pixelCacheLimitBox = QtWidgets.QSpinBox()
+        self.pixelCacheLimitBox.setRange(256, 1048576)
+        self.pixelCacheLimitBox.setSingleStep(1024)
+        self.pixelCacheLimitBox.setSuffix(" MB")
+        self.pixelCacheLimitBox.setValue(config.pixelCacheLimit)
+        self.pixelCacheLimitBox.setEnabled(config.pixelCacheEnabled)
+        self.pixelCacheLimitBox.setToolTip(pixelCacheToolTip)
+        self.pixelCacheBox.toggled.connect(self.pixelCacheLimitBox.setEnabled)
+        pixelCacheLayout = QtWidgets.QHBoxLayout()
+        pixelCacheLayout.addWidget(self.pixelCacheBox)
+        pixelCacheLayout.addWidget(self.pixelCacheLimitBox, 1)
+
+        autosaveToolTip = (
+            "Save counts automatically this long after the last change. "
+            "Marked images are saved once you pause."
+        )
+        autosaveLabel = QtWidgets.QLabel()
+        autosaveLabel.setText("Autosave")
+        autosaveLabel.setToolTip(autosaveToolTip)
+        self.autosaveBox = QtWidgets.QSpinBox()
+        self.autosaveBox.setRange(0, 3600)
+        self.autosaveBox.setSingleStep(10)
+        self.autosaveBox.setSpecialValueText("Off")  # shown for 0
+        self.autosaveBox.setSuffix(" s")
+        self.autosaveBox.setValue(config.autosaveDelay)
+        self.autosaveBox.setToolTip(autosaveToolTip)
+
+        markedOverlaysToolTip = (
+            "Save the drawings of marked images as small overlays (SVG files) "
+            "instead of full copies of the images. Marked copies can still "
+            "be exported from the library."
+        )
+        markedOverlaysLabel = QtWidgets.QLabel()
+        markedOverlaysLabel.setText("Marked images as overlays")
+        markedOverlaysLabel.setToolTip(markedOverlaysToolTip)
+        self.markedOverlaysBox = QtWidgets.QCheckBox()
+        self.markedOverlaysBox.setChecked(config.markedOverlays)
+        self.markedOverlaysBox.setToolTip(markedOverlaysToolTip)
+
         form = QtWidgets.QFormLayout()
         form.addRow(usernameLabel, self.usernameBox)
+        form.addRow(autosaveLabel, self.autosaveBox)
+        form.addRow(markedOverlaysLabel, self.markedOverlaysBox)
+        form.addRow(loadWorkersLabel, self.loadWorkersBox)
+        form.addRow(memoryLabel, self.memoryBox)
+        form.addRow(prefetchLabel, self.prefetchBox)
+        form.addRow(tilingLabel, tilingLayout)
+        form.addRow(pixelCacheLabel, pixelCacheLayout)
 
         buttonBox = QtWidgets.QDialogButtonBox()
         buttonBox.addButton(QtWidgets.QDialogButtonBox.Ok)
@@ -38,4 +152,13 @@ class PreferencesDialog(QtWidgets.QDialog):
     @QtCore.Slot()
     def _okPressed(self):
         config.username = self.usernameBox.text()
+        config.maxLoadWorkers = self.loadWorkersBox.value()
+        config.pixelMemoryBudget = self.memoryBox.value()
+        config.prefetchNextTransect = self.prefetchBox.isChecked()
+        config.gridRows = self.gridRowsBox.value()
+        config.gridColumns = self.gridColumnsBox.value()
+        config.pixelCacheEnabled = self.pixelCacheBox.isChecked()
+        config.pixelCacheLimit = self.pixelCacheLimitBox.value()
+        config.autosaveDelay = self.autosaveBox.value()
+        config.markedOverlays = self.markedOverlaysBox.isChecked()
         self.close()
@@ -0,0 +1,471 @@
+"""
+Benchmarks of the paths that load, merge and save images.
+
+Usage (from the root of the repository):
+
+    python tests/benchmarks/run.py --output benchmarks.json
+    python tests/benchmarks/run.py --compare benchmarks.json
+
+A synthetic flight is generated first (see `synthetic.py`) and reused by
+later runs with the same parameters. Every run of a benchmark happens in
+a fresh process, so that caches of earlier runs do not carry over and
+the peak memory use (RSS) of each benchmark can be measured on its own.
+Thumbnail caches and saved data in the transect are removed before each
+run, but the operating system's file cache is not.
+
+The results are written to a JSON file, which can be given to
+`--compare` when benchmarking another version.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from synthetic import makeFlight
+
+repoFolder = Path(__file__).resolve().parents[2]
+sourceFolder = repoFolder / "src" / "main" / "python"
+settingsFile = repoFolder / "src" / "build" / "settings" / "base.json"
+
+# Benchmark functions, by name. Each is given the parsed arguments
+# and the folders of the synthetic flight and transect,
+# and returns the number of seconds its timed section took.
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def peakRss():
+    """
+    The peak resident set size of this process so far, in bytes
+    """
+    try:
+        import resource
+    except ImportError:
+        return _windowsPeakRss()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def _windowsPeakRss():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+        process, ctypes.byref(counters), counters.cb
+    )
+    return counters.PeakWorkingSetSize if ok else None
+
+
+# Running a benchmark (in its own process)
+
+
+def _setUpApplication(dataFolder):
+    """
+    Creates the application headlessly, with settings of its own,
+    so that the preferences of whoever runs the benchmarks do not
+    change the results.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(sourceFolder))
+
+    from PySide2 import QtCore
+
+    QtCore.QSettings.setDefaultFormat(QtCore.QSettings.IniFormat)
+    QtCore.QSettings.setPath(
+        QtCore.QSettings.IniFormat,
+        QtCore.QSettings.UserScope,
+        str(dataFolder / "settings"),
+    )
+
+    from base import ctx
+
+    return ctx.app
+
+
+def _resetTransect(transectFolder):
+    """
+    Removes everything ImageWAO saved in the transect folder
+    """
+    from base import config
+
+    for fp in (
+        config.thumbnailFolder(transectFolder),
+        config.markedFolder(transectFolder),
+    ):
+        shutil.rmtree(fp, ignore_errors=True)
+
+
+def _waitFor(condition, timeout=600):
+    """
+    Processes events until `condition()` is true
+    """
+    from PySide2 import QtCore
+
+    app = QtCore.QCoreApplication.instance()
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise TimeoutError("Benchmark did not finish in time")
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+
+
+def _waitForMessage(model, text):
+    """
+    Returns a callable that tells whether `model`
+    has emitted a message starting with `text`
+    """
+    messages = []
+    model.message.connect(lambda msg: messages.append(msg[0]))
+    return lambda: any(m.startswith(text) for m in messages)
+
+
+def _loadedModel(args, transectFolder):
+    """
+    A grid model with all images of the transect loaded.
+    Returns the model and the number of seconds loading took.
+    """
+    from ui.gridviewer.gridmodel import QImageGridModel
+
+    model = QImageGridModel()
+
+    # Twice: the model only takes a new width once it is asked for twice
+    model.setDisplayWidth(args.grid_width)
+    model.setDisplayWidth(args.grid_width)
+
+    loaded = _waitForMessage(model, "Images loaded")
+
+    start = time.perf_counter()
+    model.tryAddFolder(transectFolder)
+    _waitFor(loaded)
+    return model, time.perf_counter() - start
+
+
+def _imageIndexes(model, i):
+    """
+    All indexes of the parts of the image at position `i`
+    """
+    rows = model.rowCount() // len(model._images)
+    return [
+        model.index(i * rows + r, c)
+        for r in range(rows)
+        for c in range(model.columnCount())
+    ]
+
+
+@benchmark
+def createFromFiles(args, flightFolder, transectFolder):
+    """
+    Loads the transect's images one after another,
+    without a thumbnail cache
+    """
+    from base import config
+    from ui.gridviewer.imagedata import FullImage
+
+    files = sorted(transectFolder.glob("*.JPG"))
+    width = args.grid_width // config.gridColumns
+
+    start = time.perf_counter()
+    FullImage.CreateFromFiles(files, config.gridRows, config.gridColumns, [width])
+    return time.perf_counter() - start
+
+
+@benchmark
+def populateModel(args, flightFolder, transectFolder):
+    """
+    Opens the transect in the grid, without a thumbnail cache
+    """
+    _, elapsed = _loadedModel(args, transectFolder)
+    return elapsed
+
+
+@benchmark
+def populateModelCached(args, flightFolder, transectFolder):
+    """
+    Opens the transect in the grid a second time,
+    with the thumbnail cache of the first time
+    """
+    _loadedModel(args, transectFolder)
+    _, elapsed = _loadedModel(args, transectFolder)
+    return elapsed
+
+
+@benchmark
+def resultantImage(args, flightFolder, transectFolder):
+    """
+    Merges the parts of every image in the transect
+    back into its full resolution image
+    """
+    from ui.gridviewer.merging import MergedIndexes
+
+    model, _ = _loadedModel(args, transectFolder)
+
+    start = time.perf_counter()
+    for i in range(len(model._images)):
+        MergedIndexes(_imageIndexes(model, i)).resultantImage()
+    return time.perf_counter() - start
+
+
+@benchmark
+def save(args, flightFolder, transectFolder):
+    """
+    Draws a box on every part of every image in the transect, then saves
+    the drawings and the marked images. Ends when the images are written.
+    """
+    from PySide2 import QtCore, QtGui
+
+    from countdata import CountData
+    from drawingdata import DrawingData, DrawingDataList
+
+    model, _ = _loadedModel(args, transectFolder)
+
+    pen = QtGui.QPen(QtGui.QColor("red"))
+    pen.setWidth(5)
+    for row in range(model.rowCount()):
+        for col in range(model.columnCount()):
+            box = QtCore.QRectF(20 + row, 20 + col, 120, 80)
+            drawing = DrawingData("Rect", box, pen, CountData("Benchmark", 1))
+            model.setDrawings(model.index(row, col), DrawingDataList([drawing]))
+
+    saved = _waitForMessage(model, "Save complete")
+
+    start = time.perf_counter()
+    model.save()
+    _waitFor(saved)
+    return time.perf_counter() - start
+
+
+@benchmark
+def categorizeFlightImages(args, flightFolder, transectFolder):
+    """
+    Splits the images of the whole flight into transects
+    by the time they were taken
+    """
+    from ui.flightimport.flightimportwizard.transecttable.transectmodel import (
+        categorizeFlightImages,
+    )
+
+    start = time.perf_counter()
+    categorizeFlightImages(flightFolder / "**" / "*", 5, 1)
+    return time.perf_counter() - start
+
+
+def runChild(args):
+    """
+    Runs the benchmark `args.child` once, and prints its results
+    as JSON on the last line of the output
+    """
+    dataFolder = Path(args.data).resolve()
+    flightFolder = dataFolder / "flight"
+    transectFolder = dataFolder / "transect"
+
+    app = _setUpApplication(dataFolder)
+    _resetTransect(transectFolder)
+
+    startRss = peakRss()
+    wallTime = BENCHMARKS[args.child](args, flightFolder, transectFolder)
+    result = {"wallTime": wallTime, "startRss": startRss, "peakRss": peakRss()}
+
+    _resetTransect(transectFolder)
+    app.quit()
+
+    print(json.dumps(result))
+
+
+# Running the suite
+
+
+def _version():
+    try:
+        with open(settingsFile, "r") as f:
+            return json.load(f)["version"]
+    except (OSError, KeyError, json.decoder.JSONDecodeError):
+        return None
+
+
+def _childArgs(args, name):
+    childArgs = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--child",
+        name,
+        "--data",
+        str(args.data),
+        "--transects",
+        str(args.transects),
+        "--grid-width",
+        str(args.grid_width),
+    ]
+    return childArgs
+
+
+def runSuite(args):
+    """
+    Runs the selected benchmarks `args.repeat` times each
+    and returns the results
+    """
+    flightFolder, transectFolder = makeFlight(
+        args.data,
+        transects=args.transects,
+        images=args.images,
+        size=(args.width, args.height),
+    )
+
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names).difference(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    benchmarks = {}
+    for name in names:
+        runs = []
+        for _ in range(args.repeat):
+            completed = subprocess.run(
+                _childArgs(args, name),
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+                check=True,
+            )
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        wallTimes = [run["wallTime"] for run in runs]
+        peaks = [run["peakRss"] for run in runs if run["peakRss"] is not None]
+        starts = [run["startRss"] for run in runs if run["startRss"] is not None]
+        benchmarks[name] = {
+            "wallTime": {
+                "runs": wallTimes,
+                "min": min(wallTimes),
+                "median": statistics.median(wallTimes),
+            },
+            "peakRss": max(peaks) if peaks else None,
+            "startRss": min(starts) if starts else None,
+        }
+        _printResult(name, benchmarks[name])
+
+    return {
+        "label": args.label,
+        "version": _version(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "parameters": {
+            "images": args.images,
+            "transects": args.transects,
+            "width": args.width,
+            "height": args.height,
+            "gridWidth": args.grid_width,
+            "repeat": args.repeat,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def _megabytes(numBytes):
+    if numBytes is None:
+        return "?"
+    return f"{numBytes / 1024 / 1024:.0f} MB"
+
+
+def _printResult(name, result, baseline=None):
+    line = (
+        f"{name:<24} {result['wallTime']['median']:8.3f} s"
+        f"  peak RSS {_megabytes(result['peakRss']):>8}"
+    )
+    if baseline is not None:
+        ratio = result["wallTime"]["median"] / baseline["wallTime"]["median"]
+        line += f"  ({ratio:.2f}x of baseline)"
+    print(line, flush=True)
+
+
+def compare(results, baseline):
+    """
+    Prints how the median wall times in `results` compare to `baseline`
+    """
+    print(f"\nCompared to {baseline.get('label') or baseline.get('timestamp')}:")
+    if results["parameters"] != baseline["parameters"]:
+        print("Warning: the benchmarks were run with different parameters")
+
+    for name, result in results["benchmarks"].items():
+        _printResult(name, result, baseline["benchmarks"].get(name))
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the paths that load, merge and save images."
+    )
+    parser.add_argument("--images", type=int, default=20, help="images per transect")
+    parser.add_argument("--transects", type=int, default=3, help="transects in flight")
+    parser.add_argument("--width", type=int, default=4000, help="image width")
+    parser.add_argument("--height", type=int, default=3000, help="image height")
+    parser.add_argument(
+        "--grid-width", type=int, default=800, help="width of the image grid"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument(
+        "--only", nargs="+", metavar="NAME", help=f"any of: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument(
+        "--data",
+        type=Path,
+        default=repoFolder / "benchmark-data",
+        help="folder to generate the synthetic flight in",
+    )
+    parser.add_argument("--output", type=Path, help="JSON file to write results to")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare to")
+    parser.add_argument("--label", default="", help="name of this run in the results")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+
+    if args.child:
+        runChild(args)
+        return
+
+    results = runSuite(args)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Synthetic flights for the benchmarks.
+
+The images are generated deterministically, so every run (and every
+version of ImageWAO) is benchmarked against exactly the same files.
+They are detailed enough that they decode about as slowly as real
+aerial photos of the same size, and carry an EXIF timestamp so that
+they can be categorized into transects like a real flight.
+"""
+
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+# EXIF tag of the time a photo was taken, in the EXIF sub-IFD
+_exifIfd = 0x8769
+_dateTimeOriginal = 36867
+
+# Generation parameters are stored here, so data is only regenerated
+# when they change
+_manifestName = "synthetic.json"
+
+
+def _baseFrame(size, seed):
+    """
+    A detailed RGB image that the frames are made from
+    """
+    w, h = size
+    mandelbrot = Image.effect_mandelbrot(size, (-2.2, -1.2, 1.0, 1.2), 100)
+    gradient = Image.linear_gradient("L").resize(size)
+    base = Image.merge("RGB", (mandelbrot, gradient, ImageChops.invert(mandelbrot)))
+
+    # Tiled noise, so that the image does not compress unrealistically well.
+    # The tile size is odd so the tiles do not line up with JPEG blocks.
+    rng = random.Random(seed)
+    n = 509
+    tile = Image.frombytes(
+        "RGB", (n, n), bytes(rng.getrandbits(8) for _ in range(n * n * 3))
+    )
+    noise = Image.new("RGB", size)
+    for x in range(0, w, n):
+        for y in range(0, h, n):
+            noise.paste(tile, (x, y))
+
+    return Image.blend(base, noise, 0.3)
+
+
+def _exif(dt: datetime):
+    exif = Image.Exif()
+    exif.get_ifd(_exifIfd)[_dateTimeOriginal] = dt.strftime("%Y:%m:%d %H:%M:%S")
+    return exif.tobytes()
+
+
+def _link(src: Path, dst: Path):
+    """
+    Hard links `src` to `dst`, or copies it where that is not possible
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def makeFlight(
+    folder,
+    transects=3,
+    images=20,
+    size=(4000, 3000),
+    interval=2,
+    gap=600,
+    start=datetime(2020, 5, 1, 9, 0, 0),
+    seed=0,
+):
+    """
+    Generates a synthetic flight in `folder`, unless the same flight
+    was already generated there. Returns the folder of the flight
+    and the folder of its first transect.
+
+    The flight folder holds `transects` * `images` JPEGs of `size`,
+    named in the order they were "taken", as they come off a camera.
+    Photos within a transect are taken `interval` seconds apart, and
+    transects are `gap` seconds apart.
+
+    The transect folder holds the images of the first transect, as
+    they would be after importing the flight.
+    """
+    folder = Path(folder)
+    flightFolder = folder / "flight"
+    transectFolder = folder / "transect"
+
+    manifest = {
+        "transects": transects,
+        "images": images,
+        "size": list(size),
+        "interval": interval,
+        "gap": gap,
+        "start": start.isoformat(),
+        "seed": seed,
+    }
+    manifestPath = folder / _manifestName
+    try:
+        with open(manifestPath, "r") as f:
+            if json.load(f) == manifest:
+                return flightFolder, transectFolder
+    except (OSError, json.decoder.JSONDecodeError):
+        pass
+
+    for fp in (flightFolder, transectFolder):
+        shutil.rmtree(fp, ignore_errors=True)
+        fp.mkdir(parents=True)
+
+    base = _baseFrame(tuple(size), seed)
+    w, h = size
+
+    number = 0
+    for t in range(transects):
+        transectStart = start + timedelta(seconds=t * (images * interval + gap))
+
+        for i in range(images):
+            # Each frame is shifted a bit, like the ground below a plane
+            frame = ImageChops.offset(base, (number * 97) % w, (number * 61) % h)
+            dt = transectStart + timedelta(seconds=i * interval)
+
+            fp = flightFolder / f"IMG_{number:05d}.JPG"
+            frame.save(fp, "JPEG", quality=90, exif=_exif(dt))
+            if t == 0:
+                _link(fp, transectFolder / fp.name)
+
+            number += 1
+
+    with open(manifestPath, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    return flightFolder, transectFolder
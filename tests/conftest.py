@@ -0,0 +1,33 @@
+"""
+Fixtures shared by the tests, which run headlessly against the sources.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sourceFolder = Path(__file__).resolve().parents[1] / "src" / "main" / "python"
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """
+    The application, with its settings kept in a temporary folder
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(sourceFolder))
+
+    from PySide2 import QtCore
+
+    QtCore.QSettings.setDefaultFormat(QtCore.QSettings.IniFormat)
+    QtCore.QSettings.setPath(
+        QtCore.QSettings.IniFormat,
+        QtCore.QSettings.UserScope,
+        str(tmp_path_factory.mktemp("settings")),
+    )
+
+    from base import ctx
+
+    return ctx.app
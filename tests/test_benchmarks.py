@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+runScript = Path(__file__).parent / "benchmarks" / "run.py"
+
+
+def test_benchmarks_run(tmp_path):
+    output = tmp_path / "results.json"
+    subprocess.run(
+        [
+            sys.executable,
+            str(runScript),
+            "--images=2",
+            "--transects=2",
+            "--width=320",
+            "--height=240",
+            "--repeat=1",
+            f"--data={tmp_path / 'data'}",
+            f"--output={output}",
+        ],
+        check=True,
+    )
+
+    with open(output, "r") as f:
+        results = json.load(f)
+
+    assert results["parameters"]["images"] == 2
+    for name in (
+        "createFromFiles",
+        "populateModel",
+        "populateModelCached",
+        "resultantImage",
+        "save",
+        "categorizeFlightImages",
+    ):
+        result = results["benchmarks"][name]
+        assert result["wallTime"]["median"] > 0
+        assert len(result["wallTime"]["runs"]) == 1
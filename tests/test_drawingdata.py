@@ -0,0 +1,47 @@
+"""
+Tests of lists of drawn items.
+"""
+
+
+def rectangle(x=10, species="Zebra"):
+    from PySide2 import QtCore, QtGui
+
+    from countdata import CountData
+    from drawingdata import DrawingData
+
+    return DrawingData(
+        "Rect",
+        QtCore.QRectF(x, 10, 40, 30),
+        QtGui.QPen(QtGui.QColor("red")),
+        CountData(species, 1),
+    )
+
+
+def test_equal_drawings_have_equal_digests(app):
+    from drawingdata import DrawingDataList
+
+    drawings = DrawingDataList([rectangle(10), rectangle(60)])
+    assert drawings.digest() == DrawingDataList([rectangle(10), rectangle(60)]).digest()
+    assert drawings.digest() == drawings.copy().digest()
+
+    # Encoding the drawings and decoding them again keeps the digest
+    assert drawings.digest() == DrawingDataList.loads(drawings.dumps()).digest()
+    assert drawings.digest() == DrawingDataList.DictDigest(drawings.toDict())
+
+
+def test_different_drawings_have_different_digests(app):
+    from drawingdata import DrawingDataList
+
+    digest = DrawingDataList([rectangle(10), rectangle(60)]).digest()
+    assert digest != DrawingDataList([rectangle(60), rectangle(10)]).digest()
+    assert digest != DrawingDataList([rectangle(10), rectangle(61)]).digest()
+    assert digest != DrawingDataList([rectangle(10), rectangle(60, "Eland")]).digest()
+    assert digest != DrawingDataList([rectangle(10)]).digest()
+
+
+def test_digests_do_not_depend_on_the_order_of_keys(app):
+    from drawingdata import DrawingDataList
+
+    data = DrawingDataList([rectangle()]).toDict()
+    reordered = [dict(reversed(list(drawing.items()))) for drawing in data]
+    assert DrawingDataList.DictDigest(reordered) == DrawingDataList.DictDigest(data)
@@ -0,0 +1,282 @@
+"""
+Tests of the image grid model, run headlessly on small generated images.
+"""
+
+import threading
+import time
+
+
+def makeTransect(folder, numImages, width=320, height=240):
+    """
+    Writes `numImages` plain JPEG images to `folder`
+    """
+    from PySide2 import QtGui
+
+    folder.mkdir(parents=True)
+    for i in range(numImages):
+        image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+        image.fill(QtGui.QColor.fromHsv(i * 10 % 360, 200, 200))
+        image.save(str(folder / f"Image_{i:03}.JPG"))
+    return folder
+
+
+def waitFor(app, condition, timeout=60):
+    """
+    Processes events until `condition()` is true
+    """
+    from PySide2 import QtCore
+
+    end = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < end, "Timed out"
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+
+        # Leaves time for threads at idle priority
+        time.sleep(0.001)
+
+
+def newModel():
+    from ui.gridviewer.gridmodel import QImageGridModel
+
+    model = QImageGridModel()
+
+    # Twice: the model only takes a new width once it is asked for twice
+    model.setDisplayWidth(400)
+    model.setDisplayWidth(400)
+    return model
+
+
+def rectangle():
+    """
+    A list with a single drawn rectangle
+    """
+    from PySide2 import QtCore, QtGui
+
+    from countdata import CountData
+    from drawingdata import DrawingData, DrawingDataList
+
+    drawing = DrawingData(
+        "Rect",
+        QtCore.QRectF(10, 10, 40, 30),
+        QtGui.QPen(QtGui.QColor("red")),
+        CountData("Zebra", 1),
+    )
+    return DrawingDataList([drawing])
+
+
+def drawOn(model, i):
+    """
+    Draws a rectangle on the last part of the image at position `i`
+    """
+    rows = model.rowCount() // len(model._images)
+    index = model.index(i * rows + rows - 1, model.columnCount() - 1)
+    model.setDrawings(index, rectangle())
+
+
+def test_switching_folders_quickly_loads_the_last_one(app, tmp_path):
+    folders = [makeTransect(tmp_path / name, 30) for name in ("A", "B", "C")]
+
+    model = newModel()
+    loaded = []
+    model.message.connect(lambda msg: loaded.append(msg[0] == "Images loaded"))
+    for folder in folders:
+        model.tryAddFolder(folder)
+        app.processEvents()
+
+    waitFor(app, lambda: any(loaded))
+
+    assert model._folder() == folders[-1]
+    assert len(model._images) == 30
+    assert all(image.isLoaded() for image in model._images)
+
+
+def requestAllParts(model):
+    """
+    Asks for every part, as a view showing all of them would
+    """
+    from PySide2 import QtCore
+
+    for r in range(model.rowCount()):
+        for c in range(model.columnCount()):
+            model.data(model.index(r, c), QtCore.Qt.DecorationRole)
+
+
+def test_resizing_quickly_rescales_to_the_last_width(app, tmp_path):
+    folder = makeTransect(tmp_path / "A", 30, 1600, 1200)
+
+    model = newModel()
+    loaded = []
+    model.message.connect(lambda msg: loaded.append(msg[0] == "Images loaded"))
+    model.tryAddFolder(folder)
+    waitFor(app, lambda: any(loaded))
+
+    for width in (600, 900, 1200, 1500, 1800, 2100):
+        model.setDisplayWidth(width)
+        model.setDisplayWidth(width)
+        requestAllParts(model)
+        app.processEvents()
+
+    width = model._singleImageWidth
+    waitFor(app, lambda: all(image.hasScaledParts(width) for image in model._images))
+
+
+def test_retiling_after_saving_leaves_nothing_to_save(app, tmp_path):
+    folder = makeTransect(tmp_path / "A", 3)
+
+    model = newModel()
+    messages = []
+    model.message.connect(lambda msg: messages.append(msg[0]))
+    model.tryAddFolder(folder)
+    waitFor(app, lambda: "Images loaded" in messages)
+
+    drawOn(model, 1)
+    model.save()
+    waitFor(app, lambda: "Save complete" in messages)
+    assert not model._dirtyImages
+
+    model.setTiling(3, 3)
+    assert not model._dirtyImages
+    assert model._images[1].hasDrawings()
+
+
+def test_changes_of_failed_autosaves_are_saved_before_switching(
+    app, tmp_path, monkeypatch
+):
+    from transectdata import TransectData
+
+    first = makeTransect(tmp_path / "A", 3)
+    second = makeTransect(tmp_path / "B", 3)
+
+    model = newModel()
+    messages = []
+    failures = []
+    model.message.connect(lambda msg: messages.append(msg[0]))
+    model.autosaveFailed.connect(lambda: failures.append(True))
+    model.tryAddFolder(first)
+    waitFor(app, lambda: "Images loaded" in messages)
+
+    # Autosaves fail until the disk "comes back"
+    save = TransectData.save
+    failing = [True]
+
+    def flakySave(self, fp):
+        if failing:
+            raise OSError("Disk unavailable")
+        save(self, fp)
+
+    monkeypatch.setattr(TransectData, "save", flakySave)
+
+    drawOn(model, 1)
+    name = model._images[1].path.name
+    model.autosave()
+    model._autosaveThreadpool.waitForDone()
+    failing.clear()
+
+    messages.clear()
+    model.tryAddFolder(second)
+    waitFor(app, lambda: "Images loaded" in messages)
+
+    assert failures
+    saveData = TransectData.load(model._loadSaveData(first).fp)
+    assert [name for name, _ in saveData.drawings()] == [name]
+
+
+def test_taking_pixels_releases_the_rendered_parts(app, tmp_path):
+    from imagecache import PixelBudget
+    from ui.gridviewer.imagedata import FullImage
+
+    fp = makeTransect(tmp_path / "A", 1) / "Image_000.JPG"
+    budget = PixelBudget()
+    image = FullImage.CreatePlaceholder(fp, 2, 2, budget=budget)
+    image.takePixels(FullImage.CreateFromFile(fp, 2, 2, [160]))
+
+    image.setDrawings(1, 1, rectangle())
+    image.drawnPart(1, 1, 160)
+    assert (image, "rendered") in budget._entries
+
+    # Loading the image again replaces the painted parts
+    image.takePixels(FullImage.CreateFromFile(fp, 2, 2, [160]))
+    assert (image, "rendered") not in budget._entries
+    assert budget.usage() == sum(n for n, _, _ in budget._entries.values())
+
+
+def test_images_made_in_memory_have_parts(app):
+    from PySide2 import QtGui
+
+    from ui.gridviewer.imagedata import FullImage
+
+    for image in (
+        QtGui.QImage(1600, 1200, QtGui.QImage.Format_RGB32),
+        QtGui.QPixmap(20, 20),
+    ):
+        image.fill(QtGui.QColor("green"))
+        fullImage = FullImage(image, initialWidths=[160])
+
+        part = fullImage.part(1, 1, 160)
+        assert not part.isNull()
+        assert part.pixelColor(part.width() // 2, part.height() // 2) == QtGui.QColor(
+            "green"
+        )
+
+
+def test_saving_after_switching_folders_saves_nothing(app, tmp_path):
+    from base import config
+
+    first = makeTransect(tmp_path / "A", 3)
+    second = makeTransect(tmp_path / "B", 3)
+
+    model = newModel()
+    messages = []
+    model.message.connect(lambda msg: messages.append(msg[0]))
+    model.tryAddFolder(first)
+    waitFor(app, lambda: "Images loaded" in messages)
+
+    # Unsaved changes are left behind when switching
+    drawOn(model, 1)
+    messages.clear()
+    model.tryAddFolder(second)
+    waitFor(app, lambda: "Images loaded" in messages)
+
+    model.save()
+    assert not config.markedDataFile(transectFolder=first).exists()
+    assert not config.markedDataFile(transectFolder=second).exists()
+
+
+def test_cancelling_a_prefetch_does_not_wait_for_it(app, tmp_path, monkeypatch):
+    from base import config
+    from imagecache import ThumbnailCache
+    from ui.gridviewer.gridmodel import QImageGridModel
+    from ui.gridviewer.imagedata import FullImage
+    from ui.gridviewer.prefetching import FolderPrefetcher
+
+    # Images that are larger than their thumbnails, which are cached
+    folder = makeTransect(tmp_path / "A", 3, 1000, 750)
+    files = QImageGridModel.imageFiles(folder)
+
+    # The first image takes until it is released
+    started = threading.Event()
+    release = threading.Event()
+    readThumbnail = FullImage.ReadThumbnail
+
+    def slowReadThumbnail(*args):
+        started.set()
+        release.wait(10)
+        return readThumbnail(*args)
+
+    monkeypatch.setattr(FullImage, "ReadThumbnail", staticmethod(slowReadThumbnail))
+
+    prefetcher = FolderPrefetcher()
+    prefetcher.prefetch(folder, files)
+    assert started.wait(10)
+
+    start = time.perf_counter()
+    prefetcher.cancel()
+    assert time.perf_counter() - start < 5
+    release.set()
+    waitFor(app, lambda: not prefetcher._running)
+
+    # The image that was being prefetched is cached, the rest is not
+    thumbnailWidth = config.gridThumbnailWidth * 2
+    cache = ThumbnailCache(folder)
+    assert [cache.contains(fp, thumbnailWidth) for fp in files] == [True, False, False]
+    assert prefetcher.cache(folder).contains(files[0], thumbnailWidth)
@@ -0,0 +1,67 @@
+"""
+Tests of the memory budget of decoded images.
+"""
+
+import pytest
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def budget(app, monkeypatch):
+    from base import config
+    from imagecache import PixelBudget
+
+    monkeypatch.setattr(config, "pixelMemoryBudget", 10)
+    return PixelBudget()
+
+
+def test_usage_follows_the_tracked_data(budget):
+    budget.add("a", "full", 2 * MB, lambda: None)
+    budget.add("a", "thumbnail", 1 * MB, lambda: None)
+    budget.add("b", "full", 3 * MB, lambda: None)
+    assert budget.usage() == 6 * MB
+
+    # Tracking the same data again replaces it
+    budget.add("a", "full", 4 * MB, lambda: None)
+    assert budget.usage() == 8 * MB
+
+    budget.remove("a", "full")
+    assert budget.usage() == 4 * MB
+    budget.remove("b")
+    assert budget.usage() == 1 * MB
+
+
+def test_least_recently_used_data_is_evicted_first(budget):
+    evicted = []
+    for owner in "abc":
+        budget.add(owner, "full", 4 * MB, lambda owner=owner: evicted.append(owner))
+    assert evicted == ["a"]
+
+    budget.touch("b", "full")
+    budget.add("d", "full", 4 * MB, lambda: evicted.append("d"))
+    assert evicted == ["a", "c"]
+    assert budget.usage() == 8 * MB
+
+
+def test_lower_tiers_are_evicted_first(budget):
+    evicted = []
+    budget.add("a", "scaled", 4 * MB, lambda: evicted.append("scaled"), tier=2)
+    budget.add("a", "full", 4 * MB, lambda: evicted.append("full"), tier=0)
+    budget.add("b", "scaled", 4 * MB, lambda: evicted.append("b"), tier=2)
+    assert evicted == ["full"]
+
+
+def test_data_larger_than_the_budget_is_kept(budget):
+    evicted = []
+    budget.add("a", "full", 20 * MB, lambda: evicted.append("a"))
+    assert evicted == []
+    assert budget.usage() == 20 * MB
+
+
+def test_hits_and_misses_are_counted(budget):
+    budget.add("a", "full", MB, lambda: None)
+    assert budget.touch("a", "full")
+    assert budget.touch("a", "full")
+    assert not budget.touch("a", "thumbnail")
+    assert budget.hitRate() == pytest.approx(2 / 3)
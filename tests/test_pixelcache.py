@@ -0,0 +1,100 @@
+"""
+Tests of the on-disk cache of decoded images.
+"""
+
+import gc
+import os
+
+
+def makeImage(color, width=600, height=600):
+    from PySide2 import QtGui
+
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(color))
+    return image
+
+
+def makeSource(folder, name):
+    """
+    A file for the cache to key its entry on. Its contents are not read.
+    """
+    fp = folder / name
+    fp.write_bytes(name.encode("utf-8"))
+    return fp
+
+
+def test_cached_pixels_are_read_back(app, tmp_path):
+    from imagecache import PixelCache
+
+    cache = PixelCache(tmp_path / "cache")
+    fp = makeSource(tmp_path, "a.jpg")
+    assert cache.get(fp) is None
+
+    cache.put(fp, makeImage("red"))
+    assert cache.contains(fp)
+    assert cache.get(fp) == makeImage("red")
+
+
+def test_changed_images_are_not_served(app, tmp_path):
+    from imagecache import PixelCache
+
+    cache = PixelCache(tmp_path / "cache")
+    fp = makeSource(tmp_path, "a.jpg")
+    cache.put(fp, makeImage("red"))
+
+    fp.write_bytes(b"changed")
+    assert cache.get(fp) is None
+
+
+def test_damaged_entries_are_not_served(app, tmp_path):
+    from imagecache import PixelCache
+
+    cache = PixelCache(tmp_path / "cache")
+    fp = makeSource(tmp_path, "a.jpg")
+    cache.put(fp, makeImage("red"))
+
+    (entryPath,) = (tmp_path / "cache").iterdir()
+    with open(entryPath, "r+b") as f:
+        f.truncate(os.path.getsize(entryPath) - 1)
+    assert cache.get(fp) is None
+
+
+def test_copies_outlive_the_image_they_were_made_from(app, tmp_path):
+    from PySide2 import QtGui
+
+    from imagecache import PixelCache
+
+    cache = PixelCache(tmp_path / "cache")
+    fp = makeSource(tmp_path, "a.jpg")
+    cache.put(fp, makeImage("red"))
+
+    # Copies that Qt makes share the pixels of the image
+    image = cache.get(fp)
+    copy = QtGui.QImage(image)
+    pixmap = QtGui.QPixmap.fromImage(image)
+    del image
+    gc.collect()
+
+    assert copy == makeImage("red")
+    assert pixmap.toImage().pixelColor(10, 10) == QtGui.QColor("red")
+
+
+def test_least_recently_used_images_are_removed_first(app, tmp_path):
+    from base import config
+    from imagecache import PixelCache
+
+    cache = PixelCache(tmp_path / "cache")
+    first = makeSource(tmp_path, "a.jpg")
+    second = makeSource(tmp_path, "b.jpg")
+
+    limit = config.pixelCacheLimit
+    config.pixelCacheLimit = 2  # MB, room for one of the images
+    try:
+        cache.put(first, makeImage("red"))
+        cache.put(second, makeImage("blue"))
+    finally:
+        config.pixelCacheLimit = limit
+
+    assert not cache.contains(first)
+    assert cache.contains(second)
+    assert cache.sizeOnDisk() > 600 * 600 * 4
@@ -0,0 +1,119 @@
+"""
+Tests of the on-disk cache of grid thumbnails.
+"""
+
+import os
+
+
+def makeThumbnail(width=400, height=300):
+    from PySide2 import QtGui
+
+    thumbnail = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    thumbnail.fill(QtGui.QColor("green"))
+    return thumbnail
+
+
+def makeSource(folder, name):
+    """
+    An image file for the cache to check its entries against.
+    Its contents are not read.
+    """
+    fp = folder / name
+    fp.write_bytes(name.encode("utf-8"))
+    return fp
+
+
+def test_thumbnails_are_read_back(app, tmp_path):
+    from PySide2 import QtCore
+
+    from imagecache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path)
+    fp = makeSource(tmp_path, "a.jpg")
+    assert cache.get(fp, 400) is None
+
+    cache.put(fp, QtCore.QSize(4000, 3000), makeThumbnail())
+    thumbnail, size = cache.get(fp, 400)
+    assert thumbnail.size() == QtCore.QSize(400, 300)
+    assert size == QtCore.QSize(4000, 3000)
+    assert cache.sourceSize(fp) == size
+
+    # Thumbnails of another width are not served
+    assert cache.get(fp, 800) is None
+    assert not cache.contains(fp, 800)
+
+
+def test_the_index_is_kept_once_flushed(app, tmp_path):
+    from PySide2 import QtCore
+
+    from imagecache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path)
+    fp = makeSource(tmp_path, "a.jpg")
+    cache.put(fp, QtCore.QSize(4000, 3000), makeThumbnail())
+    assert not ThumbnailCache(tmp_path).contains(fp, 400)
+
+    cache.flush()
+    assert ThumbnailCache(tmp_path).contains(fp, 400)
+    assert not list(cache.folder.glob("*.tmp"))
+
+
+def test_changed_images_are_pruned(app, tmp_path):
+    from PySide2 import QtCore
+
+    from imagecache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path)
+    changed = makeSource(tmp_path, "a.jpg")
+    unchanged = makeSource(tmp_path, "b.jpg")
+    for fp in (changed, unchanged):
+        cache.put(fp, QtCore.QSize(4000, 3000), makeThumbnail())
+    (cache.folder / "orphan.jpg").write_bytes(b"")
+
+    stat = changed.stat()
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.check() == ["a.jpg"]
+    assert cache.get(changed, 400) is None
+
+    assert cache.prune() == 2
+    assert cache.contains(unchanged, 400)
+    assert sorted(fp.name for fp in cache.folder.iterdir()) == ["b.jpg"]
+
+
+def test_least_recently_used_thumbnails_are_removed_first(app, tmp_path, monkeypatch):
+    from PySide2 import QtCore
+
+    from base import config
+    from imagecache import ThumbnailCache
+
+    # Noise compresses badly: about 0.4 MB each
+    cache = ThumbnailCache(tmp_path)
+    files = [makeSource(tmp_path, f"{name}.jpg") for name in "abc"]
+    for fp in files:
+        thumbnail = makeThumbnail(800, 600)
+        bits = memoryview(thumbnail.bits())
+        bits[:] = os.urandom(len(bits))
+        cache.put(fp, QtCore.QSize(4000, 3000), thumbnail)
+    cache.get(files[0], 800)
+
+    monkeypatch.setattr(config, "thumbnailCacheLimit", 1)
+    cache.flush()
+
+    assert [cache.contains(fp, 800) for fp in files] == [True, False, True]
+    assert cache.sizeOnDisk() <= 1024 * 1024
+
+
+def test_clearing_removes_every_thumbnail(app, tmp_path):
+    from PySide2 import QtCore
+
+    from imagecache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path)
+    fp = makeSource(tmp_path, "a.jpg")
+    cache.put(fp, QtCore.QSize(4000, 3000), makeThumbnail())
+    cache.flush()
+
+    cache.clear()
+    assert not cache.contains(fp, 400)
+    assert not ThumbnailCache(tmp_path).contains(fp, 400)
+    assert cache.sizeOnDisk() == 0
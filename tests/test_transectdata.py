@@ -0,0 +1,189 @@
+"""
+Tests of transect save data and its journal.
+"""
+
+import json
+
+import pytest
+
+
+def rectangles(n=1):
+    """
+    A list of `n` drawn rectangles
+    """
+    from PySide2 import QtCore, QtGui
+
+    from countdata import CountData
+    from drawingdata import DrawingData, DrawingDataList
+
+    return DrawingDataList(
+        [
+            DrawingData(
+                "Rect",
+                QtCore.QRectF(10 * i, 10, 40, 30),
+                QtGui.QPen(QtGui.QColor("red")),
+                CountData("Zebra", 1),
+            )
+            for i in range(n)
+        ]
+    )
+
+
+@pytest.fixture
+def saveFile(app, tmp_path):
+    """
+    A save file with drawings on two images, and no journal
+    """
+    from transectdata import TransectData
+
+    fp = tmp_path / "data.transect"
+    data = TransectData({}, fp)
+    data.addDrawings("a.jpg", rectangles(1))
+    data.addDrawings("b.jpg", rectangles(2))
+    data.save(fp)
+    return fp
+
+
+def savedDrawings(fp):
+    from transectdata import TransectData
+
+    return {
+        name: len(drawings.toDict())
+        for name, drawings in TransectData.load(fp).drawings()
+    }
+
+
+def test_changes_are_appended_to_the_journal(saveFile):
+    from transectdata import TransectData
+
+    saved = saveFile.read_text()
+    data = TransectData.load(saveFile)
+    data.addDrawings("a.jpg", rectangles(3))
+    data.removeDrawings("b.jpg")
+    data.addDrawings("c.jpg", rectangles(1))
+    data.save(saveFile)
+
+    assert saveFile.read_text() == saved
+    journal = TransectData.JournalFile(saveFile).read_text().splitlines()
+    assert [json.loads(line)["image"] for line in journal] == [
+        "a.jpg",
+        "b.jpg",
+        "c.jpg",
+    ]
+    assert savedDrawings(saveFile) == {"a.jpg": 3, "c.jpg": 1}
+
+
+def test_only_changes_since_the_last_save_are_appended(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    assert not data.hasChanges()
+    data.addDrawings("a.jpg", rectangles(3))
+    data.save(saveFile)
+    data.save(saveFile)
+
+    journal = TransectData.JournalFile(saveFile).read_text().splitlines()
+    assert len(journal) == 1
+
+
+def test_an_interrupted_append_is_ignored(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    data.addDrawings("a.jpg", rectangles(3))
+    data.save(saveFile)
+
+    with open(TransectData.JournalFile(saveFile), "a") as f:
+        f.write('{"image": "b.jpg", "draw')
+
+    assert savedDrawings(saveFile) == {"a.jpg": 3, "b.jpg": 2}
+
+
+def test_compacting_merges_the_journal(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    data.removeDrawings("a.jpg")
+    data.save(saveFile)
+
+    TransectData.Compact(saveFile)
+    assert not TransectData.JournalFile(saveFile).exists()
+    assert savedDrawings(saveFile) == {"b.jpg": 2}
+
+    # Nothing to do without a journal
+    TransectData.Compact(saveFile)
+    assert savedDrawings(saveFile) == {"b.jpg": 2}
+
+
+def test_large_journals_are_compacted_when_saving(saveFile, monkeypatch):
+    from transectdata import TransectData
+
+    monkeypatch.setattr(TransectData, "minCompactSize", 0)
+    data = TransectData.load(saveFile)
+    for n in range(1, 20):
+        data.addDrawings("a.jpg", rectangles(n))
+        data.save(saveFile)
+        if not TransectData.JournalFile(saveFile).exists():
+            break
+    else:
+        pytest.fail("The journal was never compacted")
+
+    assert not TransectData.needsCompacting(saveFile)
+    assert savedDrawings(saveFile) == {"a.jpg": n, "b.jpg": 2}
+
+
+def test_snapshots_take_the_changes_made_so_far(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    data.addDrawings("a.jpg", rectangles(3))
+    snapshot = data.snapshot()
+    assert snapshot.hasChanges()
+    assert not data.hasChanges()
+
+    # Later changes are not part of the snapshot
+    data.addDrawings("b.jpg", rectangles(4))
+    snapshot.save(saveFile)
+    assert savedDrawings(saveFile) == {"a.jpg": 3, "b.jpg": 2}
+
+    data.save(saveFile)
+    assert savedDrawings(saveFile) == {"a.jpg": 3, "b.jpg": 4}
+
+
+def test_changes_of_failed_snapshots_can_be_restored(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    data.addDrawings("a.jpg", rectangles(3))
+    snapshot = data.snapshot()
+
+    # The snapshot could not be saved
+    data.restoreChanges(snapshot)
+    assert not snapshot.hasChanges()
+    assert data.hasChanges()
+
+    data.save(saveFile)
+    assert savedDrawings(saveFile) == {"a.jpg": 3, "b.jpg": 2}
+
+
+def test_saved_drawings_are_compared_by_digest(saveFile):
+    from transectdata import TransectData
+
+    data = TransectData.load(saveFile)
+    assert data.imageHasDrawings("a.jpg", rectangles(1))
+    assert not data.imageHasDrawings("a.jpg", rectangles(2))
+    assert not data.imageHasDrawings("c.jpg", rectangles(1))
+
+
+def test_drawings_saved_without_a_digest_are_compared(saveFile):
+    from transectdata import TransectData
+
+    # As saved before digests were
+    saved = json.loads(saveFile.read_text())
+    for imageData in saved.values():
+        del imageData["drawingsDigest"]
+    saveFile.write_text(json.dumps(saved))
+
+    data = TransectData.load(saveFile)
+    assert data.imageHasDrawings("b.jpg", rectangles(2))
+    assert not data.imageHasDrawings("b.jpg", rectangles(1))